@@ -7,8 +7,16 @@
 - ApiRequestError -> совет повторить позже.
 """
 
-import platform
+import functools
+import heapq
+import io
+import operator
+import re
 import shlex
+import sys
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
 
 from valutatrade_hub.core.currencies import (
     CryptoCurrency,
@@ -59,18 +67,71 @@ HELP_TEXT = """
       Выход
 """.strip()
 
+_BANNER = (
+    "=== ValutaTrade Hub ===\n"
+    "Введите 'help' для списка команд.\n"
+)
+
+_PROMPT = "vtHub> "
+
+_STDIN_BUFFER_SIZE = 16384
+_POSIX = sys.platform != "win32"
+_FLAG_PREFIX = "--"
+_TRADE_FUNCS = {"buy": buy_currency, "sell": sell_currency}
+_BY_RATE = operator.itemgetter(1)
+_NUMERIC = re.compile(
+    r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?"
+).fullmatch
+_FMT_BIG = "{:.2f}".format
+_FMT_SMALL = "{:.5f}".format
+
+# Тикеры криптовалют из реестра (реестр статичен)
+_CRYPTO_CODES = frozenset(
+    code
+    for code in get_supported_codes()
+    if isinstance(get_currency(code), CryptoCurrency)
+)
+
+# (данные rates.json, пары по убыванию курса)
+# — см. _load_rates_cached
+_RATES_CACHE: tuple[dict, dict] | None = None
+
+
+@dataclass
+class _Session:
+    """Состояние CLI-сессии: пользователь, портфель, хранилище."""
+
+    user: User | None = None
+    portfolio: Portfolio | None = None
+    db: DatabaseManager = field(default_factory=DatabaseManager)
+    # Клиенты API курсов по источнику: создаются при первом
+    # update-rates и держат keep-alive сессии до выхода
+    rate_clients: dict = field(default_factory=dict)
+
+    def close(self) -> None:
+        """Закрыть HTTP-сессии клиентов API курсов."""
+        for client in self.rate_clients.values():
+            client.close()
+        self.rate_clients.clear()
+
 
 def run_cli() -> None:
     """Главный цикл CLI-приложения."""
-    print("=== ValutaTrade Hub ===")
-    print("Введите 'help' для списка команд.\n")
+    _buffer_stdin()
+    print(_BANNER)
+
+    session = _Session()
+    try:
+        _loop(session)
+    finally:
+        session.close()
 
-    current_user: User | None = None
-    current_portfolio: Portfolio | None = None
 
+def _loop(session: _Session) -> None:
+    """Читать и выполнять команды до exit/EOF."""
     while True:
         try:
-            raw = input("vtHub> ")
+            raw = input(_PROMPT)
         except (EOFError, KeyboardInterrupt):
             print("\nВыход.")
             break
@@ -84,85 +145,134 @@ def run_cli() -> None:
         if cmd == "exit":
             print("До свидания!")
             break
-        elif cmd == "help":
-            print(HELP_TEXT)
-        elif cmd == "currencies":
-            _handle_currencies()
-        elif cmd == "register":
-            _handle_register(args)
-        elif cmd == "login":
-            current_user, current_portfolio = (
-                _handle_login(args)
-                or (current_user, current_portfolio)
-            )
-        elif cmd == "show-portfolio":
-            _handle_show_portfolio(
-                args, current_user, current_portfolio
-            )
-        elif cmd == "buy":
-            result = _handle_buy(
-                args, current_user, current_portfolio
-            )
-            if result:
-                current_portfolio = result
-        elif cmd == "sell":
-            result = _handle_sell(
-                args, current_user, current_portfolio
-            )
-            if result:
-                current_portfolio = result
-        elif cmd == "get-rate":
-            _handle_get_rate(args)
-        elif cmd == "update-rates":
-            _handle_update_rates(args)
-        elif cmd == "show-rates":
-            _handle_show_rates(args)
-        else:
+
+        handler = _COMMANDS.get(cmd)
+        if handler is None:
             print(
                 f"Неизвестная команда: '{cmd}'. "
                 "Введите 'help'."
             )
+        else:
+            handler(session, args)
 
 
 # ── Парсинг ввода ────────────────────────────────────────
 
 
+def _buffer_stdin() -> None:
+    """Читать stdin блоками при неинтерактивном вводе.
+
+    Для pipe/файла (скрипты, тесты) input() обслуживается
+    буфером _STDIN_BUFFER_SIZE вместо мелких чтений.
+    В терминале stdin не трогаем — readline остаётся.
+    Оборачивается только исходный sys.__stdin__ и один
+    раз: повторный run_cli() видит уже обёрнутый поток.
+    """
+    stdin = sys.stdin
+    if (
+        stdin is None
+        or stdin is not sys.__stdin__
+        or stdin.isatty()
+        or not hasattr(stdin, "buffer")
+    ):
+        return
+    raw = getattr(stdin.buffer, "raw", stdin.buffer)
+    sys.stdin = io.TextIOWrapper(
+        io.BufferedReader(
+            raw, buffer_size=_STDIN_BUFFER_SIZE
+        ),
+        encoding=stdin.encoding or "utf-8",
+    )
+
+
 def _parse_input(raw: str) -> tuple[str, list[str]]:
-    """Разбить строку на команду и аргументы."""
-    posix = platform.system() != "Windows"
-    try:
-        tokens = shlex.split(raw, posix=posix)
-    except ValueError:
+    """Разбить строку на команду и аргументы.
+
+    Строки с паролем (login/register) разбираются
+    без кеша — открытый пароль не задерживается
+    в памяти процесса.
+    """
+    if "password" in raw.lower():
+        cmd, args = _split_input(raw, _POSIX)
+    else:
+        cmd, args = _parse_input_cached(raw, _POSIX)
+    return cmd, list(args)
+
+
+def _split_input(
+    raw: str, posix: bool
+) -> tuple[str, tuple[str, ...]]:
+    """Разбор строки на команду и кортеж аргументов.
+
+    Без кавычек и обратных слэшей shlex не нужен —
+    достаточно str.split().
+    """
+    if '"' not in raw and "'" not in raw and "\\" not in raw:
         tokens = raw.split()
+    else:
+        try:
+            tokens = shlex.split(raw, posix=posix)
+        except ValueError:
+            tokens = raw.split()
     if not tokens:
-        return "", []
-    return tokens[0].lower(), tokens[1:]
+        return "", ()
+    cmd = tokens[0]
+    if not cmd.islower():
+        cmd = cmd.lower()
+    return cmd, tuple(tokens[1:])
+
+
+# Повторные команды частые — разбор кешируется
+_parse_input_cached = functools.lru_cache(maxsize=256)(
+    _split_input
+)
 
 
 def _parse_flags(
     args: list[str],
 ) -> dict[str, str]:
-    """Разобрать аргументы вида --key value в словарь."""
+    """Разобрать аргументы вида --key value в словарь.
+
+    Один проход по очереди токенов: значение флага —
+    следующий токен, если он сам не флаг.
+    """
     flags: dict[str, str] = {}
-    i = 0
-    while i < len(args):
-        arg = args[i]
-        if arg.startswith("--") and len(arg) > 2:
-            key = arg[2:]
-            if (
-                i + 1 < len(args)
-                and not args[i + 1].startswith("--")
-            ):
-                flags[key] = args[i + 1]
-                i += 2
+    queue = deque(args)
+    while queue:
+        arg = queue.popleft()
+        if len(arg) > 2 and arg[:2] == _FLAG_PREFIX:
+            if queue and queue[0][:2] != _FLAG_PREFIX:
+                flags[arg[2:]] = queue.popleft()
             else:
-                flags[key] = ""
-                i += 1
-        else:
-            i += 1
+                flags[arg[2:]] = ""
     return flags
 
 
+def _flag(
+    flags: dict[str, str],
+    key: str,
+    *,
+    upper: bool = False,
+    default: str = "",
+) -> str:
+    """Получить значение флага, очищенное от пробелов.
+
+    Args:
+        flags: Результат _parse_flags.
+        key: Имя флага без "--".
+        upper: Привести к коду валюты (верхний регистр,
+            интернирование).
+        default: Значение, если флаг не передан.
+    """
+    value = flags.get(key)
+    if value is None:
+        return default
+    if not value:
+        return ""
+    value = value.strip()
+    return sys.intern(value.upper()) if upper else value
+
+
 # ── Проверка авторизации ─────────────────────────────────
 
 
@@ -186,7 +296,7 @@ def _require_login(
 def _handle_register(args: list[str]) -> None:
     """Обработать команду register."""
     flags = _parse_flags(args)
-    username = flags.get("username", "")
+    username = _flag(flags, "username")
     password = flags.get("password", "")
 
     if not username or not password:
@@ -208,7 +318,7 @@ def _handle_login(
 ) -> tuple[User, Portfolio] | None:
     """Обработать команду login."""
     flags = _parse_flags(args)
-    username = flags.get("username", "")
+    username = _flag(flags, "username")
     password = flags.get("password", "")
 
     if not username or not password:
@@ -242,82 +352,43 @@ def _handle_show_portfolio(
         return
 
     flags = _parse_flags(args)
-    base = flags.get("base", "USD").upper()
+    base = _flag(flags, "base", upper=True, default="USD")
 
     print(show_portfolio(user, portfolio, base))
 
 
-def _handle_buy(
+def _handle_trade(
+    kind: str,
     args: list[str],
     user: User | None,
     portfolio: Portfolio | None,
 ) -> Portfolio | None:
-    """Обработать команду buy."""
-    if not _require_login(user, portfolio):
-        return None
-
-    flags = _parse_flags(args)
-    currency = flags.get("currency", "")
-    amount_str = flags.get("amount", "")
-
-    if not currency or not amount_str:
-        print(
-            "Использование: buy "
-            "--currency <код> --amount <кол-во>"
-        )
-        return None
-
-    try:
-        amount = float(amount_str)
-    except ValueError:
-        print(f"Ошибка: '{amount_str}' не число")
-        return None
-
-    try:
-        updated, msg = buy_currency(
-            portfolio, currency, amount
-        )
-        print(msg)
-        return updated
-    except CurrencyNotFoundError as exc:
-        _print_currency_error(exc)
-        return None
-    except InsufficientFundsError as exc:
-        print(f"Ошибка: {exc}")
-        return None
-    except ValueError as exc:
-        print(f"Ошибка: {exc}")
-        return None
-
+    """Обработать команду buy или sell.
 
-def _handle_sell(
-    args: list[str],
-    user: User | None,
-    portfolio: Portfolio | None,
-) -> Portfolio | None:
-    """Обработать команду sell."""
+    Args:
+        kind: Вид сделки — ключ _TRADE_FUNCS ("buy"/"sell").
+    """
     if not _require_login(user, portfolio):
         return None
 
     flags = _parse_flags(args)
-    currency = flags.get("currency", "")
-    amount_str = flags.get("amount", "")
+    currency = _flag(flags, "currency", upper=True)
+    amount_str = _flag(flags, "amount")
 
     if not currency or not amount_str:
         print(
-            "Использование: sell "
+            f"Использование: {kind} "
             "--currency <код> --amount <кол-во>"
         )
         return None
 
-    try:
-        amount = float(amount_str)
-    except ValueError:
+    if not _NUMERIC(amount_str):
         print(f"Ошибка: '{amount_str}' не число")
         return None
+    amount = float(amount_str)
 
     try:
-        updated, msg = sell_currency(
+        updated, msg = _TRADE_FUNCS[kind](
             portfolio, currency, amount
         )
         print(msg)
@@ -336,8 +407,8 @@ def _handle_sell(
 def _handle_get_rate(args: list[str]) -> None:
     """Обработать команду get-rate."""
     flags = _parse_flags(args)
-    from_cur = flags.get("from", "")
-    to_cur = flags.get("to", "")
+    from_cur = _flag(flags, "from", upper=True)
+    to_cur = _flag(flags, "to", upper=True)
 
     if not from_cur or not to_cur:
         print(
@@ -360,19 +431,20 @@ def _handle_get_rate(args: list[str]) -> None:
         print(f"Ошибка: {exc}")
 
 
-def _handle_update_rates(args: list[str]) -> None:
+def _handle_update_rates(
+    session: _Session, args: list[str]
+) -> None:
     """Обработать команду update-rates.
 
     Запуск немедленного обновления курсов
     из внешних API (CoinGecko, ExchangeRate-API).
+    Клиенты переиспользуются между вызовами
+    в рамках сессии (session.rate_clients).
     """
     from valutatrade_hub.parser_service.api_clients import (
         CoinGeckoClient,
         ExchangeRateApiClient,
     )
-    from valutatrade_hub.parser_service.config import (
-        ParserConfig,
-    )
     from valutatrade_hub.parser_service.storage import (
         RatesStorage,
     )
@@ -381,18 +453,22 @@ def _handle_update_rates(args: list[str]) -> None:
     )
 
     flags = _parse_flags(args)
-    source = flags.get("source", "").lower()
+    source = _flag(flags, "source").lower()
 
-    config = ParserConfig()
     storage = RatesStorage()
 
+    factories = {
+        "coingecko": CoinGeckoClient,
+        "exchangerate": ExchangeRateApiClient,
+    }
     clients = []
-    if not source or source == "coingecko":
-        clients.append(CoinGeckoClient(config))
-    if not source or source == "exchangerate":
-        clients.append(
-            ExchangeRateApiClient(config)
-        )
+    for name, factory in factories.items():
+        if source and source != name:
+            continue
+        client = session.rate_clients.get(name)
+        if client is None:
+            client = session.rate_clients[name] = factory()
+        clients.append(client)
 
     if not clients:
         print(
@@ -401,56 +477,57 @@ def _handle_update_rates(args: list[str]) -> None:
         )
         return
 
-    print("INFO: Starting rates update...")
+    print("INFO: Starting rates update...", flush=True)
 
     updater = RatesUpdater(clients, storage)
     result = updater.run_update()
 
-    for name, count in result["sources"].items():
-        print(
-            f"INFO: Fetching from {name}... "
-            f"OK ({count} rates)"
-        )
-    for error in result["errors"]:
-        print(f"ERROR: {error}")
+    out = [
+        f"INFO: Fetching from {name}... OK ({count} rates)"
+        for name, count in result["sources"].items()
+    ]
+    out.extend(
+        f"ERROR: {error}" for error in result["errors"]
+    )
 
     total = result["total_rates"]
     if total:
-        print(
+        out.append(
             f"INFO: Writing {total} rates "
             "to data/rates.json..."
         )
-        print(
+        out.append(
             f"Update successful. "
             f"Total rates updated: {total}. "
             f"Last refresh: "
             f"{result['last_refresh']}"
         )
     elif result["errors"]:
-        print(
+        out.append(
             "Update completed with errors. "
             "Check logs/actions.log for details."
         )
     else:
-        print("No rates updated.")
+        out.append("No rates updated.")
 
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
 
-def _handle_show_rates(args: list[str]) -> None:
+
+def _handle_show_rates(
+    args: list[str], db: DatabaseManager
+) -> None:
     """Обработать команду show-rates.
 
     Показать актуальные курсы из локального кеша
     с фильтрацией по валюте, top-N, базовой валюте.
     """
     flags = _parse_flags(args)
-    currency_filter = flags.get(
-        "currency", ""
-    ).upper()
-    top_str = flags.get("top", "")
-    base = flags.get("base", "USD").upper()
+    currency_filter = _flag(flags, "currency", upper=True)
+    top_str = _flag(flags, "top")
+    base = _flag(flags, "base", upper=True, default="USD")
 
-    db = DatabaseManager()
-    rates = db.load_rates()
-    pairs = rates.get("pairs", {})
+    rates, pairs = _load_rates_cached(db)
     last_refresh = rates.get(
         "last_refresh", "неизвестно"
     )
@@ -478,7 +555,9 @@ def _handle_show_rates(args: list[str]) -> None:
             return
         pairs = filtered
 
-    # Конвертация в другую базу
+    # Конвертация в другую базу. pairs уже упорядочены
+    # по убыванию курса, а деление на курс базы порядок
+    # не меняет — повторная сортировка не нужна.
     display = _build_display_pairs(
         pairs, base
     )
@@ -487,42 +566,89 @@ def _handle_show_rates(args: list[str]) -> None:
     if top_str:
         display = _filter_top(display, top_str)
 
-    # Сортировка по убыванию курса
-    items = sorted(
-        display.items(),
-        key=lambda x: x[1],
-        reverse=True,
-    )
+    items = display.items()
 
-    print(
+    lines = [
         f"Rates from cache "
         f"(updated at {last_refresh}):"
+    ]
+    lines.extend(
+        f"  - {key}: {_fmt_display(rate_val)}"
+        for key, rate_val in items
     )
-    for key, rate_val in items:
-        print(f"  - {key}: {_fmt_display(rate_val)}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def _handle_currencies() -> None:
     """Показать список поддерживаемых валют."""
-    codes = get_supported_codes()
     print(
         "Поддерживаемые валюты: "
-        + ", ".join(codes)
+        + _supported_codes_str()
     )
 
 
+# ── Таблица команд ───────────────────────────────────────
+
+
+def _cmd_login(session: _Session, args: list[str]) -> None:
+    """Команда login: обновить пользователя сессии."""
+    result = _handle_login(args)
+    if result:
+        session.user, session.portfolio = result
+
+
+def _cmd_trade(
+    kind: str,
+) -> Callable[[_Session, list[str]], None]:
+    """Команда buy/sell: обновить портфель сессии."""
+
+    def command(session: _Session, args: list[str]) -> None:
+        result = _handle_trade(
+            kind, args, session.user, session.portfolio
+        )
+        if result:
+            session.portfolio = result
+
+    return command
+
+
+_COMMANDS: dict[str, Callable[[_Session, list[str]], None]] = {
+    "help": lambda session, args: print(HELP_TEXT),
+    "currencies": lambda session, args: _handle_currencies(),
+    "register": lambda session, args: _handle_register(args),
+    "login": _cmd_login,
+    "show-portfolio": lambda session, args: (
+        _handle_show_portfolio(
+            args, session.user, session.portfolio
+        )
+    ),
+    "buy": _cmd_trade("buy"),
+    "sell": _cmd_trade("sell"),
+    "get-rate": lambda session, args: _handle_get_rate(args),
+    "update-rates": _handle_update_rates,
+    "show-rates": lambda session, args: (
+        _handle_show_rates(args, session.db)
+    ),
+}
+
+
 # ── Вспомогательные ──────────────────────────────────────
 
 
+@functools.lru_cache(maxsize=1)
+def _supported_codes_str() -> str:
+    """Строка поддерживаемых кодов (реестр статичен)."""
+    return ", ".join(get_supported_codes())
+
+
 def _print_currency_error(
     exc: CurrencyNotFoundError,
 ) -> None:
     """Вывести ошибку о неизвестной валюте."""
     print(f"Ошибка: {exc}")
-    codes = get_supported_codes()
     print(
         "Поддерживаемые валюты: "
-        + ", ".join(codes)
+        + _supported_codes_str()
     )
     print(
         "Используйте 'get-rate --from <код> "
@@ -530,6 +656,35 @@ def _print_currency_error(
     )
 
 
+def _load_rates_cached(
+    db: DatabaseManager,
+) -> tuple[dict, dict]:
+    """Загрузить rates.json и пары, отсортированные по курсу.
+
+    Разбор файла кеширует DatabaseManager (по mtime
+    и размеру); сортировка пересчитывается, только
+    когда он вернул новый объект данных — как индекс
+    в DatabaseManager._portfolios_by_id.
+
+    Returns:
+        Кортеж (данные rates.json, пары по убыванию курса).
+    """
+    global _RATES_CACHE
+    rates = db.load_rates()
+    cached = _RATES_CACHE
+    if cached is not None and cached[0] is rates:
+        return cached
+    ranked = dict(
+        sorted(
+            rates.get("pairs", {}).items(),
+            key=lambda x: x[1]["rate"],
+            reverse=True,
+        )
+    )
+    _RATES_CACHE = (rates, ranked)
+    return rates, ranked
+
+
 def _build_display_pairs(
     pairs: dict, base: str
 ) -> dict[str, float]:
@@ -537,34 +692,23 @@ def _build_display_pairs(
 
     Если base != USD, конвертирует через кросс-курс.
     """
-    if base == "USD":
-        return {
-            k: v["rate"] for k, v in pairs.items()
-        }
-
-    # Найти курс базовой валюты к USD
-    base_key = f"{base}_USD"
-    base_rate = None
-    for k, v in pairs.items():
-        if k == base_key:
-            base_rate = v["rate"]
-            break
-
+    base_info = (
+        pairs.get(f"{base}_USD") if base != "USD" else None
+    )
+    base_rate = base_info["rate"] if base_info else None
     if not base_rate:
         return {
             k: v["rate"] for k, v in pairs.items()
         }
 
-    result = {}
-    for key, info in pairs.items():
-        parts = key.split("_")
-        from_cur = parts[0]
-        if from_cur == base:
-            continue
-        rate_base = info["rate"] / base_rate
-        result[f"{from_cur}_{base}"] = rate_base
-
-    return result
+    prefix = f"{base}_"
+    return {
+        f"{key.split('_', 1)[0]}_{base}": (
+            info["rate"] / base_rate
+        )
+        for key, info in pairs.items()
+        if not key.startswith(prefix)
+    }
 
 
 def _filter_top(
@@ -576,28 +720,21 @@ def _filter_top(
     except ValueError:
         return display
 
-    crypto_pairs = {}
-    for key, rate_val in display.items():
-        code = key.split("_")[0]
-        try:
-            curr = get_currency(code)
-            if isinstance(curr, CryptoCurrency):
-                crypto_pairs[key] = rate_val
-        except CurrencyNotFoundError:
-            pass
+    crypto_pairs = {
+        key: rate_val
+        for key, rate_val in display.items()
+        if key.split("_", 1)[0] in _CRYPTO_CODES
+    }
 
-    top = dict(
-        sorted(
-            crypto_pairs.items(),
-            key=lambda x: x[1],
-            reverse=True,
-        )[:n]
+    return dict(
+        heapq.nlargest(
+            n, crypto_pairs.items(), key=_BY_RATE
+        )
     )
-    return top
 
 
 def _fmt_display(rate_val: float) -> str:
     """Форматировать курс для отображения."""
-    if rate_val >= 1:
-        return f"{rate_val:.2f}"
-    return f"{rate_val:.5f}"
+    return (_FMT_BIG if rate_val >= 1 else _FMT_SMALL)(
+        rate_val
+    )
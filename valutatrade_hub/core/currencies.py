@@ -3,6 +3,7 @@
 Реестр валют с фабричным методом get_currency().
 """
 
+import sys
 from abc import ABC, abstractmethod
 
 from valutatrade_hub.core.exceptions import CurrencyNotFoundError
@@ -16,6 +17,8 @@ class Currency(ABC):
         name: str — человекочитаемое название.
     """
 
+    __slots__ = ("code", "name")
+
     def __init__(self, code: str, name: str):
         """Инициализировать валюту с валидацией.
 
@@ -26,7 +29,7 @@ class Currency(ABC):
         Raises:
             ValueError: Если code или name некорректны.
         """
-        code = code.strip().upper()
+        code = sys.intern(code.strip().upper())
         if not code or len(code) < 2 or len(code) > 5:
             raise ValueError(
                 "Код валюты: 2-5 символов верхнего регистра"
@@ -42,6 +45,27 @@ class Currency(ABC):
         self.code = code
         self.name = name.strip()
 
+    @classmethod
+    def _unchecked(
+        cls, code: str, name: str, **extra
+    ) -> "Currency":
+        """Создать валюту без валидации.
+
+        Только для доверенных данных реестра, которые
+        уже нормализованы.
+
+        Args:
+            code: Код валюты (верхний регистр).
+            name: Название валюты.
+            **extra: Атрибуты подкласса.
+        """
+        currency = object.__new__(cls)
+        currency.code = code
+        currency.name = name
+        for attr, value in extra.items():
+            setattr(currency, attr, value)
+        return currency
+
     @abstractmethod
     def get_display_info(self) -> str:
         """Строковое представление для UI/логов."""
@@ -58,6 +82,8 @@ class FiatCurrency(Currency):
         issuing_country: str — страна/зона эмиссии.
     """
 
+    __slots__ = ("issuing_country",)
+
     def __init__(
         self, code: str, name: str, issuing_country: str
     ):
@@ -87,6 +113,8 @@ class CryptoCurrency(Currency):
         market_cap: float — рыночная капитализация.
     """
 
+    __slots__ = ("algorithm", "market_cap")
+
     def __init__(
         self,
         code: str,
@@ -117,34 +145,52 @@ class CryptoCurrency(Currency):
 
 # ── Реестр валют ─────────────────────────────────────────
 
+# Доверенные данные реестра: (код, название, страна)
+_FIAT_DATA = (
+    ("USD", "US Dollar", "United States"),
+    ("EUR", "Euro", "Eurozone"),
+    ("GBP", "British Pound", "United Kingdom"),
+    ("JPY", "Japanese Yen", "Japan"),
+    ("RUB", "Russian Ruble", "Russia"),
+    ("CNY", "Chinese Yuan", "China"),
+)
+
+# (тикер, название, алгоритм, капитализация)
+_CRYPTO_DATA = (
+    ("BTC", "Bitcoin", "SHA-256", 1.12e12),
+    ("ETH", "Ethereum", "Ethash", 4.2e11),
+    ("SOL", "Solana", "Proof of History", 8.5e10),
+    ("DOGE", "Dogecoin", "Scrypt", 2.3e10),
+    ("XRP", "Ripple", "RPCA", 3.1e10),
+)
+
 _CURRENCY_REGISTRY: dict[str, Currency] = {
-    "USD": FiatCurrency(
-        "USD", "US Dollar", "United States"
-    ),
-    "EUR": FiatCurrency("EUR", "Euro", "Eurozone"),
-    "GBP": FiatCurrency(
-        "GBP", "British Pound", "United Kingdom"
-    ),
-    "JPY": FiatCurrency("JPY", "Japanese Yen", "Japan"),
-    "RUB": FiatCurrency(
-        "RUB", "Russian Ruble", "Russia"
-    ),
-    "CNY": FiatCurrency("CNY", "Chinese Yuan", "China"),
-    "BTC": CryptoCurrency(
-        "BTC", "Bitcoin", "SHA-256", 1.12e12
-    ),
-    "ETH": CryptoCurrency(
-        "ETH", "Ethereum", "Ethash", 4.2e11
-    ),
-    "SOL": CryptoCurrency(
-        "SOL", "Solana", "Proof of History", 8.5e10
-    ),
-    "DOGE": CryptoCurrency(
-        "DOGE", "Dogecoin", "Scrypt", 2.3e10
-    ),
-    "XRP": CryptoCurrency(
-        "XRP", "Ripple", "RPCA", 3.1e10
-    ),
+    code: FiatCurrency._unchecked(
+        code, name, issuing_country=country
+    )
+    for code, name, country in _FIAT_DATA
+}
+_CURRENCY_REGISTRY.update(
+    (
+        code,
+        CryptoCurrency._unchecked(
+            code, name, algorithm=algo, market_cap=mcap
+        ),
+    )
+    for code, name, algo, mcap in _CRYPTO_DATA
+)
+
+_SUPPORTED_CODES: tuple[str, ...] = tuple(
+    sorted(_CURRENCY_REGISTRY)
+)
+
+# Быстрый поиск без нормализации: код как есть и в нижнем регистре
+_CURRENCY_LOOKUP: dict[str, Currency] = {
+    **_CURRENCY_REGISTRY,
+    **{
+        code.lower(): currency
+        for code, currency in _CURRENCY_REGISTRY.items()
+    },
 }
 
 
@@ -160,12 +206,16 @@ def get_currency(code: str) -> Currency:
     Raises:
         CurrencyNotFoundError: Если код не найден.
     """
-    code = code.strip().upper()
-    if code not in _CURRENCY_REGISTRY:
+    currency = _CURRENCY_LOOKUP.get(code)
+    if currency is not None:
+        return currency
+    code = sys.intern(code.strip().upper())
+    currency = _CURRENCY_REGISTRY.get(code)
+    if currency is None:
         raise CurrencyNotFoundError(code)
-    return _CURRENCY_REGISTRY[code]
+    return currency
 
 
-def get_supported_codes() -> list[str]:
-    """Получить список поддерживаемых кодов валют."""
-    return sorted(_CURRENCY_REGISTRY.keys())
+def get_supported_codes() -> tuple[str, ...]:
+    """Получить отсортированные коды поддерживаемых валют."""
+    return _SUPPORTED_CODES
@@ -1,23 +1,68 @@
 """Модели данных: User, Wallet, Portfolio."""
 
+import hmac
+import math
+import operator
+import sys
+from collections.abc import Mapping
 from datetime import datetime
+from types import MappingProxyType
 
 from valutatrade_hub.core.exceptions import (
     InsufficientFundsError,
 )
 from valutatrade_hub.core.utils import (
+    PBKDF2_ITERATIONS,
     generate_salt,
-    hash_password,
+    hash_password_bytes,
+    normalize_code,
 )
 
 
+def _decode_hash(hashed_password: str) -> bytes:
+    """Декодировать hex-хеш пароля в байты (пусто при ошибке)."""
+    try:
+        return bytes.fromhex(hashed_password)
+    except (TypeError, ValueError):
+        return b""
+
+
+def _to_amount(value) -> float | None:
+    """Привести сумму к конечному float.
+
+    Строки и bool не принимаются, как и NaN/inf.
+
+    Returns:
+        Число или None, если значение некорректно.
+    """
+    if isinstance(value, (str, bool)):
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
 class User:
     """Пользователь системы ValutaTrade Hub.
 
-    Хранит данные аутентификации с хешированием (SHA-256 + соль).
+    Хранит данные аутентификации с хешированием
+    (PBKDF2-HMAC-SHA256 + соль).
     Все атрибуты приватные с геттерами/сеттерами.
     """
 
+    __slots__ = (
+        "_user_id",
+        "_username",
+        "_hashed_password",
+        "_hash_digest",
+        "_salt",
+        "_salt_bytes",
+        "_iterations",
+        "_registration_date",
+    )
+
     def __init__(
         self,
         user_id: int,
@@ -25,6 +70,7 @@ class User:
         hashed_password: str,
         salt: str,
         registration_date: str | None = None,
+        iterations: int = PBKDF2_ITERATIONS,
     ):
         """Инициализировать пользователя.
 
@@ -34,14 +80,18 @@ class User:
             hashed_password: Хеш пароля.
             salt: Соль для хеширования.
             registration_date: Дата регистрации (ISO).
+            iterations: Итерации PBKDF2 (0 — старый
+                SHA-256 хеш).
         """
         self._user_id = user_id
         self.username = username
         self._hashed_password = hashed_password
+        self._hash_digest = _decode_hash(hashed_password)
         self._salt = salt
-        self._registration_date = (
-            registration_date or datetime.now().isoformat()
-        )
+        self._salt_bytes = salt.encode("utf-8")
+        self._iterations = iterations
+        # Текущая дата подставляется лениво при первом чтении
+        self._registration_date = registration_date or None
 
     # ── Свойства ──────────────────────────────────────
 
@@ -77,6 +127,10 @@ class User:
     @property
     def registration_date(self) -> str:
         """Дата регистрации в формате ISO."""
+        if self._registration_date is None:
+            self._registration_date = datetime.now().isoformat(
+                timespec="seconds"
+            )
         return self._registration_date
 
     # ── Методы ────────────────────────────────────────
@@ -90,7 +144,7 @@ class User:
         return {
             "user_id": self._user_id,
             "username": self._username,
-            "registration_date": self._registration_date,
+            "registration_date": self.registration_date,
         }
 
     def change_password(self, new_password: str) -> None:
@@ -106,15 +160,44 @@ class User:
             raise ValueError(
                 "Пароль должен быть не короче 4 символов"
             )
+        self._set_password(new_password)
+
+    @property
+    def needs_rehash(self) -> bool:
+        """Хеш слабее текущего (старый SHA-256 или
+        меньше итераций PBKDF2)."""
+        return self._iterations < PBKDF2_ITERATIONS
+
+    def rehash_password(self, password: str) -> None:
+        """Перехешировать уже проверенный пароль.
+
+        Вызывается после успешного входа, если
+        needs_rehash: пароль переводится на PBKDF2
+        с текущим числом итераций и новой солью.
+        """
+        self._set_password(password)
+
+    def _set_password(self, password: str) -> None:
+        """Сохранить PBKDF2-хеш пароля с новой солью."""
         self._salt = generate_salt()
-        self._hashed_password = hash_password(
-            new_password, self._salt
+        self._salt_bytes = self._salt.encode("utf-8")
+        self._iterations = PBKDF2_ITERATIONS
+        self._hash_digest = hash_password_bytes(
+            password, self._salt_bytes, self._iterations
         )
+        self._hashed_password = self._hash_digest.hex()
 
     def verify_password(self, password: str) -> bool:
-        """Проверить введённый пароль на совпадение."""
-        return self._hashed_password == hash_password(
-            password, self._salt
+        """Проверить введённый пароль на совпадение.
+
+        Сравнение сырых дайджестов за постоянное время
+        (hmac.compare_digest), без hex-кодирования.
+        """
+        return hmac.compare_digest(
+            self._hash_digest,
+            hash_password_bytes(
+                password, self._salt_bytes, self._iterations
+            ),
         )
 
     # ── Сериализация ──────────────────────────────────
@@ -126,7 +209,8 @@ class User:
             "username": self._username,
             "hashed_password": self._hashed_password,
             "salt": self._salt,
-            "registration_date": self._registration_date,
+            "iterations": self._iterations,
+            "registration_date": self.registration_date,
         }
 
     @classmethod
@@ -140,6 +224,7 @@ class User:
             registration_date=data.get(
                 "registration_date"
             ),
+            iterations=data.get("iterations", 0),
         )
 
     def __repr__(self) -> str:
@@ -158,6 +243,8 @@ class Wallet:
     При недостатке средств — InsufficientFundsError.
     """
 
+    __slots__ = ("currency_code", "_balance")
+
     def __init__(
         self, currency_code: str, balance: float = 0.0
     ):
@@ -167,7 +254,9 @@ class Wallet:
             currency_code: Код валюты.
             balance: Начальный баланс (по умолч. 0.0).
         """
-        self.currency_code = currency_code.upper()
+        self.currency_code = sys.intern(
+            normalize_code(currency_code)
+        )
         self._balance: float = 0.0
         self.balance = balance
 
@@ -179,16 +268,18 @@ class Wallet:
     @balance.setter
     def balance(self, value: float) -> None:
         """Установить баланс с валидацией."""
-        if not isinstance(value, (int, float)):
+        amount = _to_amount(value)
+        if amount is None:
             raise ValueError(
-                "Баланс должен быть числом, "
+                "Баланс должен быть конечным числом, "
                 f"получен {type(value).__name__}"
             )
+        value = amount
         if value < 0:
             raise ValueError(
                 "Баланс не может быть отрицательным"
             )
-        self._balance = float(value)
+        self._balance = value
 
     def deposit(self, amount: float) -> None:
         """Пополнить баланс.
@@ -199,10 +290,8 @@ class Wallet:
         Raises:
             ValueError: Если amount не положительное число.
         """
-        if (
-            not isinstance(amount, (int, float))
-            or amount <= 0
-        ):
+        amount = _to_amount(amount)
+        if amount is None or amount <= 0:
             raise ValueError(
                 "Сумма пополнения должна быть "
                 "положительным числом"
@@ -219,21 +308,20 @@ class Wallet:
             ValueError: Если amount некорректен.
             InsufficientFundsError: Недостаточно средств.
         """
-        if (
-            not isinstance(amount, (int, float))
-            or amount <= 0
-        ):
+        amount = _to_amount(amount)
+        if amount is None or amount <= 0:
             raise ValueError(
                 "Сумма снятия должна быть "
                 "положительным числом"
             )
-        if amount > self._balance:
+        balance = self._balance
+        if amount > balance:
             raise InsufficientFundsError(
-                available=self._balance,
+                available=balance,
                 required=amount,
                 code=self.currency_code,
             )
-        self._balance -= amount
+        self._balance = balance - amount
 
     def get_balance_info(self) -> str:
         """Информация о текущем балансе."""
@@ -269,6 +357,8 @@ class Portfolio:
     Обеспечивает уникальность валют и расчёт стоимости.
     """
 
+    __slots__ = ("_user_id", "_wallets", "_wallets_view")
+
     def __init__(
         self,
         user_id: int,
@@ -282,6 +372,7 @@ class Portfolio:
         """
         self._user_id = user_id
         self._wallets: dict[str, Wallet] = wallets or {}
+        self._wallets_view = MappingProxyType(self._wallets)
 
     @property
     def user_id(self) -> int:
@@ -289,9 +380,9 @@ class Portfolio:
         return self._user_id
 
     @property
-    def wallets(self) -> dict[str, Wallet]:
-        """Копия словаря кошельков."""
-        return dict(self._wallets)
+    def wallets(self) -> Mapping[str, Wallet]:
+        """Кошельки только для чтения (без копирования)."""
+        return self._wallets_view
 
     def add_currency(self, currency_code: str) -> Wallet:
         """Добавить новый кошелёк (если его ещё нет).
@@ -302,37 +393,53 @@ class Portfolio:
         Returns:
             Объект Wallet для данной валюты.
         """
-        currency_code = currency_code.upper()
-        if currency_code in self._wallets:
-            return self._wallets[currency_code]
-        wallet = Wallet(currency_code)
-        self._wallets[currency_code] = wallet
+        currency_code = sys.intern(
+            normalize_code(currency_code)
+        )
+        wallet = self._wallets.get(currency_code)
+        if wallet is None:
+            wallet = Wallet(currency_code)
+            self._wallets[currency_code] = wallet
         return wallet
 
     def get_wallet(
         self, currency_code: str
     ) -> Wallet | None:
         """Получить кошелёк по коду валюты."""
-        return self._wallets.get(currency_code.upper())
+        return self._wallets.get(
+            sys.intern(normalize_code(currency_code))
+        )
 
     def get_total_value(
         self,
         rates: dict,
         base_currency: str = "USD",
     ) -> float:
-        """Общая стоимость портфеля в базовой валюте."""
-        total = 0.0
+        """Общая стоимость портфеля в базовой валюте.
+
+        Балансы и курсы собираются в параллельные списки,
+        а умножение с суммированием идёт одним проходом
+        sum(map(mul, ...)) на стороне C.
+        """
+        if not self._wallets:
+            return 0.0
+        rates_get = rates.get
+        balances = []
+        factors = []
         for code, wallet in self._wallets.items():
-            if wallet.balance == 0:
+            balance = wallet._balance
+            if balance == 0:
                 continue
             if code == base_currency:
-                total += wallet.balance
+                factor = 1.0
             else:
-                key = f"{code}_{base_currency}"
-                info = rates.get(key)
-                if info and isinstance(info, dict):
-                    total += wallet.balance * info["rate"]
-        return total
+                info = rates_get(f"{code}_{base_currency}")
+                if not info or not isinstance(info, dict):
+                    continue
+                factor = info["rate"]
+            balances.append(balance)
+            factors.append(factor)
+        return sum(map(operator.mul, balances, factors), 0.0)
 
     # ── Сериализация ──────────────────────────────────
 
@@ -341,7 +448,7 @@ class Portfolio:
         return {
             "user_id": self._user_id,
             "wallets": {
-                code: w.to_dict()
+                code: {"balance": w._balance}
                 for code, w in self._wallets.items()
             },
         }
@@ -8,15 +8,20 @@
 - decorators.py для логирования (@log_action).
 """
 
+import functools
+import hashlib
+import operator
+import secrets
+import time
 from datetime import datetime
 
 from valutatrade_hub.core.currencies import (
     CryptoCurrency,
     get_currency,
+    get_supported_codes,
 )
 from valutatrade_hub.core.exceptions import (
     ApiRequestError,
-    CurrencyNotFoundError,
     InsufficientFundsError,
 )
 from valutatrade_hub.core.models import (
@@ -27,6 +32,7 @@ from valutatrade_hub.core.utils import (
     generate_salt,
     get_next_user_id,
     hash_password,
+    normalize_code,
 )
 from valutatrade_hub.decorators import log_action
 from valutatrade_hub.infra.database import DatabaseManager
@@ -55,15 +61,14 @@ def register_user(username: str, password: str) -> str:
         )
 
     db = DatabaseManager()
-    users = db.load_users()
-
-    for u in users:
-        if u["username"].lower() == username.lower():
-            raise ValueError(
-                f"Имя пользователя '{username}' "
-                "уже занято"
-            )
+    if username.lower() in db.load_users_index():
+        raise ValueError(
+            f"Имя пользователя '{username}' "
+            "уже занято"
+        )
 
+    users = db.load_users()
+    # users.json — единственный источник id: max + 1
     user_id = get_next_user_id(users)
     salt = generate_salt()
     hashed = hash_password(password, salt)
@@ -73,7 +78,6 @@ def register_user(username: str, password: str) -> str:
         username=username,
         hashed_password=hashed,
         salt=salt,
-        registration_date=datetime.now().isoformat(),
     )
     users.append(user.to_dict())
     db.save_users(users)
@@ -106,23 +110,23 @@ def login_user(
         ValueError: Неверные учётные данные.
     """
     db = DatabaseManager()
-    users = db.load_users()
-
-    user_data = None
-    for u in users:
-        if u["username"].lower() == username.lower():
-            user_data = u
-            break
-
+    user_data = db.load_users_index().get(
+        username.lower()
+    )
     if not user_data:
         raise ValueError(
             f"Пользователь '{username}' не найден"
         )
 
     user = User.from_dict(user_data)
-    if not user.verify_password(password):
+    if not _verify_cached(user, password):
         raise ValueError("Неверный пароль")
 
+    if user.needs_rehash:
+        # Старый хеш переводим на PBKDF2 при первом входе
+        user.rehash_password(password)
+        _save_user(db, user)
+
     portfolio_data = db.load_portfolio(user.user_id)
     if portfolio_data:
         portfolio = Portfolio.from_dict(portfolio_data)
@@ -153,9 +157,13 @@ def show_portfolio(
     db = DatabaseManager()
     rates = db.load_rates()
     pairs = _extract_pairs(rates)
+    wallets = portfolio.wallets
+    rate_table = _build_rate_table(
+        wallets, base_currency, pairs
+    )
 
     total = _convert_portfolio_value(
-        portfolio, pairs, base_currency
+        portfolio, rate_table, base_currency
     )
 
     lines = [
@@ -166,27 +174,66 @@ def show_portfolio(
         "-" * 40,
     ]
 
-    wallets = portfolio.wallets
     if not wallets:
         lines.append("  (пусто)")
     else:
-        for code, wallet in sorted(wallets.items()):
-            bal = _fmt_balance(
-                wallet.balance, code
-            )
-            val_str = _wallet_value_str(
+        lines.extend(
+            f"  {code}: "
+            f"{_fmt_balance(wallet.balance, code)}"
+            + _wallet_value_str(
                 wallet.balance,
                 code,
-                pairs,
+                rate_table,
                 base_currency,
             )
-            lines.append(
-                f"  {code}: {bal}{val_str}"
-            )
+            for code, wallet in sorted(wallets.items())
+        )
 
     return "\n".join(lines)
 
 
+def bulk_portfolio_values(
+    base_currency: str = "USD",
+) -> dict[int, float]:
+    """Оценить все портфели в базовой валюте.
+
+    Курсы загружаются один раз, а курс каждой валюты
+    вычисляется однократно для всех пользователей.
+
+    Args:
+        base_currency: Базовая валюта для оценки.
+
+    Returns:
+        Словарь user_id → оценочная стоимость.
+
+    Raises:
+        CurrencyNotFoundError: Неизвестная базовая валюта.
+    """
+    base_currency = normalize_code(base_currency)
+    get_currency(base_currency)
+
+    db = DatabaseManager()
+    pairs = _extract_pairs(db.load_rates())
+
+    factors: dict[str, float] = {}
+    totals: dict[int, float] = {}
+    for data in db.load_portfolios():
+        total = 0.0
+        for code, w_data in data.get("wallets", {}).items():
+            balance = w_data.get("balance", 0.0)
+            if not balance:
+                continue
+            factor = factors.get(code)
+            if factor is None:
+                factor = factors[code] = (
+                    _compute_rate(code, base_currency, pairs)
+                    or 0.0
+                )
+            total += balance * factor
+        totals[data["user_id"]] = total
+    return totals
+
+
 # ── Покупка / Продажа ────────────────────────────────────
 
 
@@ -213,7 +260,7 @@ def buy_currency(
         CurrencyNotFoundError: Неизвестная валюта.
         ValueError: Некорректная сумма.
     """
-    currency_code = currency_code.upper()
+    currency_code = normalize_code(currency_code)
     currency = get_currency(currency_code)
 
     if amount <= 0:
@@ -221,30 +268,29 @@ def buy_currency(
             "Сумма покупки должна быть положительной"
         )
 
-    wallet = portfolio.get_wallet(currency_code)
-    if not wallet:
-        wallet = portfolio.add_currency(currency_code)
+    wallet = portfolio.add_currency(currency_code)
 
     wallet.deposit(amount)
 
     db = DatabaseManager()
-    db.save_portfolio(portfolio.to_dict())
-
-    rates = db.load_rates()
-    pairs = _extract_pairs(rates)
-    cost_str = _estimate_cost(
-        amount, currency_code, pairs
+    db.append_wallet_update(
+        portfolio.user_id, currency_code, wallet.balance
     )
 
-    display = currency.get_display_info()
+    rate = _usd_rate(
+        currency_code, _extract_pairs(db.load_rates())
+    )
+    spec = _balance_spec(currency_code)
+    estimate = (
+        f"\n  Оценочная стоимость: ~{amount * rate:.2f} USD"
+        if rate
+        else ""
+    )
     msg = (
-        f"Куплено {_fmt_balance(amount, currency_code)}"
-        f" {currency_code}. "
-        f"Баланс: "
-        f"{_fmt_balance(wallet.balance, currency_code)}"
-        f" {currency_code}"
-        f"{cost_str}\n"
-        f"  {display}"
+        f"Куплено {amount:{spec}} {currency_code}. "
+        f"Баланс: {wallet.balance:{spec}} {currency_code}"
+        f"{estimate}\n"
+        f"  {currency.get_display_info()}"
     )
     return portfolio, msg
 
@@ -272,7 +318,7 @@ def sell_currency(
         InsufficientFundsError: Недостаточно средств.
         ValueError: Некорректная сумма.
     """
-    currency_code = currency_code.upper()
+    currency_code = normalize_code(currency_code)
     currency = get_currency(currency_code)
 
     if amount <= 0:
@@ -291,24 +337,24 @@ def sell_currency(
     wallet.withdraw(amount)
 
     db = DatabaseManager()
-    db.save_portfolio(portfolio.to_dict())
-
-    rates = db.load_rates()
-    pairs = _extract_pairs(rates)
-    revenue_str = _estimate_revenue(
-        amount, currency_code, pairs
+    db.append_wallet_update(
+        portfolio.user_id, currency_code, wallet.balance
     )
 
-    display = currency.get_display_info()
+    rate = _usd_rate(
+        currency_code, _extract_pairs(db.load_rates())
+    )
+    spec = _balance_spec(currency_code)
+    estimate = (
+        f"\n  Оценочная выручка: ~{amount * rate:.2f} USD"
+        if rate
+        else ""
+    )
     msg = (
-        f"Продано "
-        f"{_fmt_balance(amount, currency_code)}"
-        f" {currency_code}. "
-        f"Баланс: "
-        f"{_fmt_balance(wallet.balance, currency_code)}"
-        f" {currency_code}"
-        f"{revenue_str}\n"
-        f"  {display}"
+        f"Продано {amount:{spec}} {currency_code}. "
+        f"Баланс: {wallet.balance:{spec}} {currency_code}"
+        f"{estimate}\n"
+        f"  {currency.get_display_info()}"
     )
     return portfolio, msg
 
@@ -335,8 +381,8 @@ def get_rate(
         CurrencyNotFoundError: Неизвестная валюта.
         ApiRequestError: Кеш курсов устарел.
     """
-    from_currency = from_currency.strip().upper()
-    to_currency = to_currency.strip().upper()
+    from_currency = normalize_code(from_currency.strip())
+    to_currency = normalize_code(to_currency.strip())
 
     from_curr = get_currency(from_currency)
     to_curr = get_currency(to_currency)
@@ -375,6 +421,52 @@ def get_rate(
 
 # ── Вспомогательные функции ──────────────────────────────
 
+# Кеш проверок пароля: (user_id, хеш, отпечаток) → (итог, время)
+_VERIFY_CACHE: dict[tuple[int, str, bytes], tuple[bool, float]] = {}
+_VERIFY_CACHE_SIZE = 1024
+_VERIFY_TTL_SECONDS = 60.0
+# Секрет процесса для ключевого blake2b-отпечатка пароля
+_VERIFY_KEY = secrets.token_bytes(32)
+
+
+def _verify_cached(user: User, password: str) -> bool:
+    """Проверить пароль с кешированием результата.
+
+    Ключ — blake2b-отпечаток пароля с секретом процесса
+    (_VERIFY_KEY): открытый текст в кеше не хранится,
+    а перебрать отпечаток без секрета нельзя. Хранимый хеш входит в ключ,
+    поэтому смена пароля сама делает записи неактуальными.
+    """
+    fingerprint = hashlib.blake2b(
+        password.encode("utf-8"),
+        key=_VERIFY_KEY,
+        digest_size=16,
+    ).digest()
+    key = (user.user_id, user.hashed_password, fingerprint)
+    now = time.monotonic()
+
+    hit = _VERIFY_CACHE.get(key)
+    if hit is not None and now - hit[1] < _VERIFY_TTL_SECONDS:
+        return hit[0]
+
+    result = user.verify_password(password)
+    if len(_VERIFY_CACHE) >= _VERIFY_CACHE_SIZE:
+        _VERIFY_CACHE.pop(next(iter(_VERIFY_CACHE)))
+    _VERIFY_CACHE[key] = (result, now)
+    return result
+
+
+def _save_user(db: DatabaseManager, user: User) -> None:
+    """Перезаписать запись пользователя в users.json."""
+    users = db.load_users()
+    for i, data in enumerate(users):
+        if data.get("user_id") == user.user_id:
+            users[i] = user.to_dict()
+            break
+    else:
+        return
+    db.save_users(users)
+
 
 def _extract_pairs(rates: dict) -> dict:
     """Извлечь пары из rates (оба формата).
@@ -405,22 +497,30 @@ def _check_ttl(rates: dict) -> None:
     if not last_refresh:
         return
 
-    try:
-        refresh_time = datetime.fromisoformat(
-            last_refresh
+    refresh_epoch = _parse_refresh_epoch(last_refresh)
+    if refresh_epoch is None:
+        return
+    age = time.time() - refresh_epoch
+    if age > ttl:
+        raise ApiRequestError(
+            f"Кеш курсов устарел "
+            f"({age:.0f}с > TTL {ttl}с). "
+            "Обновите курсы или проверьте "
+            "Parser Service."
         )
-        age = (
-            datetime.now() - refresh_time
-        ).total_seconds()
-        if age > ttl:
-            raise ApiRequestError(
-                f"Кеш курсов устарел "
-                f"({age:.0f}с > TTL {ttl}с). "
-                "Обновите курсы или проверьте "
-                "Parser Service."
-            )
-    except ValueError:
-        pass
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_refresh_epoch(last_refresh: str) -> float | None:
+    """Разобрать last_refresh в Unix-время (кешируется).
+
+    Значение меняется только при обновлении курсов,
+    поэтому ISO-строка разбирается один раз.
+    """
+    try:
+        return datetime.fromisoformat(last_refresh).timestamp()
+    except (ValueError, TypeError):
+        return None
 
 
 def _compute_rate(
@@ -448,30 +548,46 @@ def _compute_rate(
     ):
         return 1.0 / rates[reverse]["rate"]
 
-    from_usd = _to_usd(from_code, rates)
-    to_usd = _to_usd(to_code, rates)
-    if from_usd and to_usd:
-        return from_usd / to_usd
+    to_usd = _usd_table(rates)
+    from_usd = to_usd.get(from_code)
+    to_usd_rate = to_usd.get(to_code)
+    if from_usd and to_usd_rate:
+        return from_usd / to_usd_rate
 
     return None
 
 
-def _to_usd(code: str, rates: dict) -> float | None:
-    """Получить курс валюты к USD."""
-    if code == "USD":
-        return 1.0
+# (объект пар, таблица code → курс к USD) — см. _usd_table
+_USD_TABLE: tuple[dict, dict[str, float]] | None = None
 
-    key = f"{code}_USD"
-    if key in rates and isinstance(rates[key], dict):
-        return rates[key]["rate"]
 
-    key_rev = f"USD_{code}"
-    if key_rev in rates and isinstance(
-        rates[key_rev], dict
-    ):
-        return 1.0 / rates[key_rev]["rate"]
+def _usd_table(rates: dict) -> dict[str, float]:
+    """Таблица курсов к USD, построенная за один проход.
 
-    return None
+    Кешируется по идентичности словаря пар: DatabaseManager
+    возвращает тот же объект, пока rates.json не изменился.
+    Пара X_USD приоритетнее обратной USD_X.
+    """
+    global _USD_TABLE
+    cached = _USD_TABLE
+    if cached is not None and cached[0] is rates:
+        return cached[1]
+
+    table: dict[str, float] = {}
+    inverse: dict[str, float] = {}
+    for key, info in rates.items():
+        if not isinstance(info, dict) or "rate" not in info:
+            continue
+        if key.endswith("_USD"):
+            table[key[:-4]] = info["rate"]
+        elif key.startswith("USD_") and info["rate"]:
+            inverse[key[4:]] = 1.0 / info["rate"]
+    for code, rate in inverse.items():
+        table.setdefault(code, rate)
+    table["USD"] = 1.0
+
+    _USD_TABLE = (rates, table)
+    return table
 
 
 def _get_updated_at(
@@ -492,76 +608,89 @@ def _get_updated_at(
     return rates.get("last_refresh", "неизвестно")
 
 
+def _build_rate_table(
+    codes,
+    base: str,
+    rates: dict,
+) -> dict[str, float | None]:
+    """Курсы к base для набора валют — по одному на код.
+
+    Args:
+        codes: Коды валют (например, ключи кошельков).
+        base: Базовая валюта.
+        rates: Пары курсов.
+
+    Returns:
+        Словарь код → курс к base (None, если не найден).
+    """
+    return {
+        code: _compute_rate(code, base, rates)
+        for code in codes
+    }
+
+
 def _convert_portfolio_value(
     portfolio: Portfolio,
-    rates: dict,
+    rate_table: dict[str, float | None],
     base: str,
 ) -> float:
-    """Рассчитать стоимость портфеля в base."""
-    total = 0.0
-    for code, wallet in portfolio.wallets.items():
-        if wallet.balance == 0:
-            continue
-        if code == base:
-            total += wallet.balance
-        else:
-            rate = _compute_rate(code, base, rates)
-            if rate:
-                total += wallet.balance * rate
-    return total
+    """Рассчитать стоимость портфеля в base.
+
+    Балансы и курсы идут параллельными последовательностями
+    в sum(map(mul, ...)) — умножение и сложение в C.
+    """
+    wallets = portfolio.wallets
+    factors = [
+        1.0 if code == base else (rate_table.get(code) or 0.0)
+        for code in wallets
+    ]
+    balances = (wallet.balance for wallet in wallets.values())
+    return sum(map(operator.mul, balances, factors), 0.0)
 
 
 def _wallet_value_str(
     balance: float,
     code: str,
-    rates: dict,
+    rate_table: dict[str, float | None],
     base: str,
 ) -> str:
     """Строка оценки кошелька в базовой валюте."""
     if balance == 0 or code == base:
         return ""
-    rate = _compute_rate(code, base, rates)
+    rate = rate_table.get(code)
     if rate:
         value = balance * rate
         return f" (~{value:.2f} {base})"
     return ""
 
 
-def _estimate_cost(
-    amount: float, code: str, rates: dict
-) -> str:
-    """Оценочная стоимость покупки в USD."""
+def _usd_rate(code: str, rates: dict) -> float | None:
+    """Курс валюты к USD для оценки сделки (None для USD)."""
     if code == "USD":
-        return ""
-    rate = _compute_rate(code, "USD", rates)
-    if rate:
-        cost = amount * rate
-        return f"\n  Оценочная стоимость: ~{cost:.2f} USD"
-    return ""
+        return None
+    return _compute_rate(code, "USD", rates)
 
 
-def _estimate_revenue(
-    amount: float, code: str, rates: dict
-) -> str:
-    """Оценочная выручка от продажи в USD."""
-    if code == "USD":
-        return ""
-    rate = _compute_rate(code, "USD", rates)
-    if rate:
-        rev = amount * rate
-        return f"\n  Оценочная выручка: ~{rev:.2f} USD"
-    return ""
+# Реестр валют статичен — классификация кодов считается один раз
+_KNOWN_CODES = frozenset(get_supported_codes())
+_CRYPTO_CODES = frozenset(
+    code
+    for code in _KNOWN_CODES
+    if isinstance(get_currency(code), CryptoCurrency)
+)
+
+
+def _balance_spec(code: str) -> str:
+    """Формат-спецификация баланса известной валюты."""
+    return ".4f" if code in _CRYPTO_CODES else ".2f"
 
 
 def _fmt_balance(value: float, code: str) -> str:
     """Формат баланса (4 знака для крипто, 2 для фиат)."""
-    try:
-        curr = get_currency(code)
-        if isinstance(curr, CryptoCurrency):
-            return f"{value:.4f}"
-    except CurrencyNotFoundError:
-        if 0 < value < 1:
-            return f"{value:.4f}"
+    if code in _CRYPTO_CODES:
+        return f"{value:.4f}"
+    if code not in _KNOWN_CODES and 0 < value < 1:
+        return f"{value:.4f}"
     return f"{value:.2f}"
 
 
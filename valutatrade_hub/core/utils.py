@@ -5,30 +5,66 @@ JSON I/O перенесён в infra/database.py.
 """
 
 import hashlib
-import os
+import secrets
 from datetime import datetime
 
 # ── Хеширование паролей ──────────────────────────────────
 
+# Итерации PBKDF2 для новых хешей; записи без поля
+# "iterations" проверяются по старой схеме SHA-256.
+PBKDF2_ITERATIONS = 100_000
+
 
 def generate_salt() -> str:
     """Сгенерировать случайную соль для хеширования."""
-    return os.urandom(16).hex()
+    return secrets.token_hex(16)
 
 
-def hash_password(password: str, salt: str) -> str:
-    """Захешировать пароль с солью через SHA-256.
+def hash_password(
+    password: str,
+    salt: str,
+    iterations: int = PBKDF2_ITERATIONS,
+) -> str:
+    """Захешировать пароль с солью (PBKDF2-HMAC-SHA256).
 
     Args:
         password: Пароль в открытом виде.
         salt: Уникальная соль пользователя.
+        iterations: Число итераций PBKDF2; 0 — старая
+            схема sha256(пароль + соль).
 
     Returns:
         Хеш-строка в hex-формате.
     """
-    return hashlib.sha256(
-        (password + salt).encode("utf-8")
-    ).hexdigest()
+    return hash_password_bytes(
+        password, salt.encode("utf-8"), iterations
+    ).hex()
+
+
+def hash_password_bytes(
+    password: str, salt: bytes, iterations: int
+) -> bytes:
+    """Захешировать пароль с уже закодированной солью.
+
+    Args:
+        password: Пароль в открытом виде.
+        salt: Соль пользователя в байтах (UTF-8).
+        iterations: Число итераций PBKDF2; 0 — старая
+            схема sha256(пароль + соль).
+
+    Returns:
+        Сырой дайджест (32 байта), без hex-кодирования.
+    """
+    if iterations:
+        return hashlib.pbkdf2_hmac(
+            "sha256",
+            password.encode("utf-8"),
+            salt,
+            iterations,
+        )
+    digest = hashlib.sha256(password.encode("utf-8"))
+    digest.update(salt)
+    return digest.digest()
 
 
 # ── Генерация ID ─────────────────────────────────────────
@@ -72,6 +108,15 @@ def format_datetime(iso_str: str | None) -> str:
 # ── Валидация ────────────────────────────────────────────
 
 
+def normalize_code(code: str) -> str:
+    """Привести код валюты к верхнему регистру.
+
+    Код, уже записанный заглавными, возвращается
+    как есть — без создания новой строки.
+    """
+    return code if code.isupper() else code.upper()
+
+
 def validate_currency_code(code: str) -> str:
     """Валидировать и нормализовать код валюты.
 
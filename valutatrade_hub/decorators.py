@@ -38,36 +38,37 @@ def log_action(func=None, *, verbose=False):
     """
 
     def decorator(fn):
+        bind, names = _make_binder(fn)
+        extract_user = _make_user_extractor(names)
+        wallet_state = (
+            _make_wallet_getter(names) if verbose else None
+        )
+        action = _ACTION_MAP.get(
+            fn.__name__, fn.__name__.upper()
+        )
+
         @functools.wraps(fn)
         def wrapper(*args, **kwargs):
-            params = _bind_params(fn, args, kwargs)
-            action = _ACTION_MAP.get(
-                fn.__name__, fn.__name__.upper()
-            )
-            user = _extract_user(params)
+            # Сообщения собираются только если их пропустит логгер
+            if not _logger.isEnabledFor(logging.ERROR):
+                return fn(*args, **kwargs)
+            info = _logger.isEnabledFor(logging.INFO)
+
+            params = bind(args, kwargs)
             currency = params.get("currency_code", "")
-            amount = params.get("amount", "")
 
             before = ""
-            if verbose and currency:
-                before = _wallet_state(params, currency)
+            if wallet_state is not None and currency and info:
+                before = wallet_state(params, currency)
 
             try:
                 result = fn(*args, **kwargs)
-                parts = _build_parts(
-                    action, user, currency, amount
-                )
-                parts.append("result=OK")
-                if verbose and before:
-                    after = _wallet_state(params, currency)
-                    parts.append(
-                        f"before={before} after={after}"
-                    )
-                _logger.info(" ".join(parts))
-                return result
             except Exception as exc:
                 parts = _build_parts(
-                    action, user, currency, amount
+                    action,
+                    extract_user(params),
+                    currency,
+                    params.get("amount", ""),
                 )
                 parts.append("result=ERROR")
                 parts.append(
@@ -77,6 +78,22 @@ def log_action(func=None, *, verbose=False):
                 _logger.error(" ".join(parts))
                 raise
 
+            if info:
+                parts = _build_parts(
+                    action,
+                    extract_user(params),
+                    currency,
+                    params.get("amount", ""),
+                )
+                parts.append("result=OK")
+                if before:
+                    after = wallet_state(params, currency)
+                    parts.append(
+                        f"before={before} after={after}"
+                    )
+                _logger.info(" ".join(parts))
+            return result
+
         return wrapper
 
     if func is not None:
@@ -84,14 +101,53 @@ def log_action(func=None, *, verbose=False):
     return decorator
 
 
-def _bind_params(fn, args, kwargs) -> dict:
-    """Связать аргументы вызова с именами параметров."""
+def _make_binder(fn):
+    """Подготовить связывание аргументов для fn.
+
+    Сигнатура разбирается один раз при декорировании.
+    Для функций только с обычными параметрами словарь
+    строится напрямую (zip имён с args + kwargs +
+    значения по умолчанию); иначе — Signature.bind.
+
+    Returns:
+        Кортеж (bind, names): функция связывания
+        и имена параметров fn.
+    """
     try:
         sig = inspect.signature(fn)
+    except (ValueError, TypeError):
+        return (lambda args, kwargs: {}), ()
+
+    params = sig.parameters.values()
+    simple = all(
+        p.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD
+        for p in params
+    )
+    names = tuple(sig.parameters)
+    defaults = {
+        p.name: p.default
+        for p in params
+        if p.default is not inspect.Parameter.empty
+    }
+
+    def bind(args, kwargs) -> dict:
+        if simple and len(args) <= len(names):
+            bound = dict(defaults)
+            bound.update(zip(names, args))
+            bound.update(kwargs)
+            return bound
+        return _bind_params(sig, args, kwargs)
+
+    return bind, names
+
+
+def _bind_params(sig, args, kwargs) -> dict:
+    """Связать аргументы вызова с именами параметров."""
+    try:
         bound = sig.bind(*args, **kwargs)
         bound.apply_defaults()
         return dict(bound.arguments)
-    except (ValueError, TypeError):
+    except TypeError:
         return {}
 
 
@@ -110,26 +166,55 @@ def _build_parts(
     return parts
 
 
-def _extract_user(params: dict) -> str:
-    """Извлечь имя/id пользователя из параметров."""
-    if "portfolio" in params:
-        p = params["portfolio"]
-        if hasattr(p, "user_id"):
-            return str(p.user_id)
-    if "username" in params:
-        return str(params["username"])
-    if "user" in params:
-        u = params["user"]
-        if hasattr(u, "username"):
-            return u.username
-    return "unknown"
-
-
-def _wallet_state(params: dict, currency: str) -> str:
-    """Получить текущий баланс кошелька."""
-    portfolio = params.get("portfolio")
-    if portfolio and hasattr(portfolio, "get_wallet"):
-        wallet = portfolio.get_wallet(currency)
-        if wallet:
-            return f"{wallet.balance:.4f}"
-    return "N/A"
+def _make_user_extractor(names: tuple[str, ...]):
+    """Подготовить извлечение пользователя для функции.
+
+    Параметр с пользователем известен по сигнатуре,
+    поэтому выбор ветки делается один раз при
+    декорировании. Приоритет: portfolio.user_id,
+    затем username, затем user.username.
+    """
+    if "portfolio" in names:
+        fallback = _make_user_extractor(
+            tuple(n for n in names if n != "portfolio")
+        )
+
+        def extract(params: dict) -> str:
+            user_id = getattr(
+                params.get("portfolio"), "user_id", None
+            )
+            if user_id is None:
+                return fallback(params)
+            return str(user_id)
+
+        return extract
+    if "username" in names:
+        return lambda params: str(
+            params.get("username", "unknown")
+        )
+    if "user" in names:
+        return lambda params: getattr(
+            params.get("user"), "username", "unknown"
+        )
+    return lambda params: "unknown"
+
+
+def _make_wallet_getter(names: tuple[str, ...]):
+    """Подготовить чтение баланса кошелька для функции.
+
+    Без параметра portfolio состояние всегда 'N/A'.
+    """
+    if "portfolio" not in names:
+        return lambda params, currency: "N/A"
+
+    def wallet_state(params: dict, currency: str) -> str:
+        get_wallet = getattr(
+            params.get("portfolio"), "get_wallet", None
+        )
+        if get_wallet is not None:
+            wallet = get_wallet(currency)
+            if wallet:
+                return f"{wallet.balance:.4f}"
+        return "N/A"
+
+    return wallet_state
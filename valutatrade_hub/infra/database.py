@@ -3,11 +3,17 @@
 Централизует все операции чтения/записи data/*.json.
 """
 
+import contextlib
 import json
 import os
+import tempfile
 
 from valutatrade_hub.infra.settings import SettingsLoader
 
+# Журнал изменений кошельков (JSON Lines) поверх portfolios.json
+WALLET_LOG_FILE = "portfolios.log.jsonl"
+WALLET_LOG_COMPACT_BYTES = 1024 * 1024
+
 
 class DatabaseManager:
     """Управление чтением/записью JSON-файлов данных.
@@ -32,40 +38,104 @@ class DatabaseManager:
         self._initialized = True
         self._settings = SettingsLoader()
         self._data_dir = self._settings.get("data_dir")
+        self._paths: dict[str, str] = {}
+        self._users_index: tuple[int, dict[str, dict]] | None = None
+        self._cache: dict[str, tuple[tuple[int, int], object]] = {}
+        self._portfolios_index: tuple[list, dict] | None = None
         os.makedirs(self._data_dir, exist_ok=True)
 
     def _path(self, filename: str) -> str:
-        """Полный путь к файлу в директории данных."""
-        return os.path.join(self._data_dir, filename)
+        """Полный путь к файлу в директории данных.
+
+        Пути вычисляются один раз на имя файла.
+        """
+        path = self._paths.get(filename)
+        if path is None:
+            path = self._paths[filename] = os.path.join(
+                self._data_dir, filename
+            )
+        return path
 
     def _read(self, filename: str, default=None):
         """Прочитать JSON-файл.
 
+        Разобранные данные кешируются по (mtime, size)
+        файла — повторное чтение без изменений не
+        парсит JSON заново. Результат разделяется между
+        вызовами: изменять его можно только перед
+        сохранением через _write (при сбое записи
+        кеш сбрасывается).
+
         Args:
             filename: Имя файла.
             default: Значение при отсутствии/ошибке.
         """
         path = self._path(filename)
-        if not os.path.exists(path):
+        try:
+            st = os.stat(path)
+        except OSError:
             return default
-        with open(path, encoding="utf-8") as fh:
-            try:
-                return json.load(fh)
-            except json.JSONDecodeError:
-                return default
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._cache.get(filename)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            with open(path, "rb") as fh:
+                raw = fh.read()
+        except OSError:
+            # Файл удалён/подменён между stat и open
+            return default
+        try:
+            data = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return default
+        self._cache[filename] = (stamp, data)
+        return data
 
     def _write(self, filename: str, data) -> None:
-        """Записать данные в JSON-файл.
+        """Атомарно записать данные в JSON-файл.
+
+        Документ сериализуется целиком, пишется одним
+        вызовом write во временный файл рядом с целевым
+        и подменяет его через os.replace — читатель
+        никогда не увидит наполовину записанный файл.
 
         Args:
             filename: Имя файла.
             data: Данные для записи.
+
+        Raises:
+            OSError: Если запись не удалась (прежний
+                файл остаётся нетронутым).
         """
+        self._invalidate(filename)
+        text = json.dumps(data, ensure_ascii=False, indent=2)
         path = self._path(filename)
-        with open(path, "w", encoding="utf-8") as fh:
-            json.dump(
-                data, fh, ensure_ascii=False, indent=2
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                suffix=".tmp", dir=self._data_dir
             )
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+                tmp.write(text)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Целевой файл не трогаем: без прямой записи поверх
+            if tmp_path:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+            # Вызывающий мог изменить разделяемые данные
+            # из кеша — после сбоя их нельзя отдавать
+            self._invalidate(filename)
+            raise
+
+    def _invalidate(self, filename: str) -> None:
+        """Сбросить кеш файла и построенные по нему индексы."""
+        self._cache.pop(filename, None)
+        if filename == "users.json":
+            self._users_index = None
+        elif filename == "portfolios.json":
+            self._portfolios_index = None
 
     # ── Users ─────────────────────────────────────────
 
@@ -74,6 +144,28 @@ class DatabaseManager:
         result = self._read("users.json", default=[])
         return result if isinstance(result, list) else []
 
+    def load_users_index(self) -> dict[str, dict]:
+        """Индекс пользователей по username.lower().
+
+        Имена сравниваются без учёта регистра — так же,
+        как при регистрации и входе; при дублях берётся
+        первая запись. Кешируется по mtime users.json;
+        сбрасывается в save_users. Возвращаемый словарь
+        не изменять.
+        """
+        try:
+            mtime = os.stat(self._path("users.json")).st_mtime_ns
+        except OSError:
+            return {}
+        cached = self._users_index
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        index: dict[str, dict] = {}
+        for u in self.load_users():
+            index.setdefault(u["username"].lower(), u)
+        self._users_index = (mtime, index)
+        return index
+
     def save_users(self, users: list[dict]) -> None:
         """Сохранить список пользователей."""
         self._write("users.json", users)
@@ -81,7 +173,11 @@ class DatabaseManager:
     # ── Portfolios ────────────────────────────────────
 
     def load_portfolios(self) -> list[dict]:
-        """Загрузить все портфели."""
+        """Загрузить все портфели.
+
+        Перед чтением сливает журнал сделок в снимок.
+        """
+        self._compact_wallet_log()
         result = self._read(
             "portfolios.json", default=[]
         )
@@ -93,31 +189,122 @@ class DatabaseManager:
         """Сохранить все портфели."""
         self._write("portfolios.json", data)
 
+    def _portfolios_by_id(
+        self,
+    ) -> tuple[list[dict], dict[int, int]]:
+        """Портфели и индекс user_id → позиция в списке.
+
+        Индекс строится один раз на каждый разобранный
+        снимок portfolios.json (см. кеш в _read).
+        """
+        portfolios = self.load_portfolios()
+        cached = self._portfolios_index
+        if cached is None or cached[0] is not portfolios:
+            index: dict[int, int] = {}
+            for i, p in enumerate(portfolios):
+                index.setdefault(p.get("user_id"), i)
+            cached = self._portfolios_index = (portfolios, index)
+        return cached
+
     def load_portfolio(
         self, user_id: int
     ) -> dict | None:
         """Загрузить портфель по user_id."""
-        for p in self.load_portfolios():
-            if p.get("user_id") == user_id:
-                return p
-        return None
+        portfolios, index = self._portfolios_by_id()
+        i = index.get(user_id)
+        return None if i is None else portfolios[i]
 
     def save_portfolio(
         self, portfolio_data: dict
     ) -> None:
         """Сохранить портфель (обновить или добавить)."""
-        portfolios = self.load_portfolios()
-        uid = portfolio_data.get("user_id")
-        updated = False
-        for i, p in enumerate(portfolios):
-            if p.get("user_id") == uid:
-                portfolios[i] = portfolio_data
-                updated = True
-                break
-        if not updated:
+        portfolios, index = self._portfolios_by_id()
+        i = index.get(portfolio_data.get("user_id"))
+        if i is None:
             portfolios.append(portfolio_data)
+        else:
+            portfolios[i] = portfolio_data
         self.save_portfolios(portfolios)
 
+    def append_wallet_update(
+        self, user_id: int, currency: str, balance: float
+    ) -> None:
+        """Записать новый баланс кошелька в журнал сделок.
+
+        Вместо перезаписи всего portfolios.json добавляет
+        одну строку JSON. Записи хранят итоговый баланс,
+        поэтому повторное применение безопасно. Журнал
+        сливается в снимок при превышении порога
+        и при следующем чтении портфелей.
+
+        Args:
+            user_id: ID владельца портфеля.
+            currency: Код валюты кошелька.
+            balance: Баланс после сделки.
+        """
+        record = {
+            "user_id": user_id,
+            "currency": currency,
+            "balance": balance,
+        }
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        path = self._path(WALLET_LOG_FILE)
+        with open(path, "ab+") as fh:
+            size = fh.seek(0, os.SEEK_END)
+            if size:
+                fh.seek(size - 1)
+                if fh.read(1) != b"\n":
+                    # Оборванная строка после сбоя — начать новую
+                    line = b"\n" + line
+            fh.write(line)
+            size = fh.tell()
+        if size > WALLET_LOG_COMPACT_BYTES:
+            self._compact_wallet_log()
+
+    def _compact_wallet_log(self) -> None:
+        """Применить журнал сделок к снимку и очистить его."""
+        path = self._path(WALLET_LOG_FILE)
+        try:
+            with open(path, encoding="utf-8") as fh:
+                lines = fh.readlines()
+        except FileNotFoundError:
+            return
+
+        records = []
+        for line in lines:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                # Оборванная запись после сбоя
+                continue
+            if (
+                isinstance(rec, dict)
+                and "user_id" in rec
+                and "currency" in rec
+                and "balance" in rec
+            ):
+                records.append(rec)
+
+        if records:
+            portfolios = self._read(
+                "portfolios.json", default=[]
+            )
+            if not isinstance(portfolios, list):
+                portfolios = []
+            by_id = {p.get("user_id"): p for p in portfolios}
+            for rec in records:
+                uid = rec["user_id"]
+                portfolio = by_id.get(uid)
+                if portfolio is None:
+                    portfolio = {"user_id": uid, "wallets": {}}
+                    portfolios.append(portfolio)
+                    by_id[uid] = portfolio
+                portfolio.setdefault("wallets", {})[
+                    rec["currency"]
+                ] = {"balance": rec["balance"]}
+            self.save_portfolios(portfolios)
+        os.remove(path)
+
     # ── Rates ─────────────────────────────────────────
 
     def load_rates(self) -> dict:
@@ -1,27 +1,48 @@
 """Настройка логирования: формат, уровень, ротация файлов.
 
 Формат: строковый (человекочитаемый).
-Ротация: по размеру файла (1 МБ, до 5 бэкапов).
+Ротация: по размеру файла (16 МБ, до 5 бэкапов).
+Запись в файл — в фоновом потоке через очередь.
 Уровень по умолчанию: INFO, для отладки — DEBUG.
 
 Пример записи:
     INFO 2025-10-09T12:05:22 BUY user='alice' ...
 """
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import (
+    QueueHandler,
+    QueueListener,
+    RotatingFileHandler,
+)
 
 from valutatrade_hub.infra.settings import SettingsLoader
 
+LOG_MAX_BYTES = 16 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
 
 def setup_logging() -> None:
     """Настроить логирование приложения.
 
     Создаёт директорию логов, файловый обработчик
     с ротацией и форматирование по строковому шаблону.
+    Логгер лишь кладёт записи в очередь (QueueHandler),
+    а форматирование и запись на диск выполняет
+    QueueListener в фоновом потоке — блокировка
+    файлового обработчика и ротация не попадают
+    на путь выполнения команд. Слушатель
+    останавливается при выходе (atexit), дописывая
+    оставшиеся записи.
     Конфигурация берётся из SettingsLoader.
     """
+    logger = logging.getLogger("valutatrade_hub")
+    if logger.handlers:
+        return
+
     settings = SettingsLoader()
     log_dir = settings.get("log_dir", "logs")
     log_level = settings.get("log_level", "INFO")
@@ -36,8 +57,8 @@ def setup_logging() -> None:
 
     file_handler = RotatingFileHandler(
         log_file,
-        maxBytes=1_000_000,
-        backupCount=5,
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
         encoding="utf-8",
     )
     file_handler.setFormatter(formatter)
@@ -46,7 +67,14 @@ def setup_logging() -> None:
     )
     file_handler.setLevel(level)
 
-    logger = logging.getLogger("valutatrade_hub")
-    logger.setLevel(logging.DEBUG)
-    if not logger.handlers:
-        logger.addHandler(file_handler)
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(
+        log_queue, file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+    # Уровень логгера = уровень обработчика: записи ниже
+    # него отсекаются до форматирования и очереди
+    logger.setLevel(level)
+    logger.addHandler(QueueHandler(log_queue))
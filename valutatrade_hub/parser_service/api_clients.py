@@ -4,39 +4,152 @@
 с единым методом fetch_rates() -> dict.
 """
 
+import copy
+import random
 import time
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from valutatrade_hub.core.exceptions import (
     ApiRequestError,
 )
 from valutatrade_hub.parser_service.config import (
+    CONFIG,
     ParserConfig,
 )
 
+# Потолок паузы после серии неудачных запросов (сек)
+_BACKOFF_CAP = 60.0
+
+
+def _make_session(retries: int) -> requests.Session:
+    """Создать сессию с пулом keep-alive соединений.
+
+    urllib3 повторяет запрос при временных ошибках и 429
+    не более retries раз. Retry-After не учитывается:
+    сервер не может растянуть ожидание интерактивной
+    команды; длинные паузы — забота бэкоффа клиента.
+
+    Args:
+        retries: Число повторов (0 — без повторов).
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=4,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 class BaseApiClient(ABC):
-    """Абстрактный клиент для получения курсов."""
+    """Абстрактный клиент для получения курсов.
 
-    def __init__(self, config: ParserConfig):
+    Каждый клиент держит свою requests.Session:
+    повторные обновления переиспользуют TCP/TLS
+    соединение вместо нового рукопожатия.
+
+    Успешный ответ кешируется на cache_ttl секунд:
+    повторный fetch_rates в этом окне не обращается
+    к API. Подклассы реализуют _request_rates().
+
+    После сбоя клиент пропускает запросы случайную
+    паузу от 0 до min(60, 2**n) секунд (full jitter,
+    n — число сбоев подряд), чтобы не долбить
+    недоступный API в такт с другими экземплярами.
+    """
+
+    def __init__(self, config: ParserConfig | None = None):
         """Инициализировать клиент.
 
         Args:
-            config: Конфигурация Parser Service.
+            config: Конфигурация Parser Service
+                (по умолчанию общий CONFIG).
         """
-        self.config = config
+        self.config = CONFIG if config is None else config
+        self._session = _make_session(
+            self.config.HTTP_RETRIES
+        )
+        self._cached: tuple[float, dict] | None = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def close(self) -> None:
+        """Закрыть HTTP-сессию клиента."""
+        self._session.close()
 
     @property
     @abstractmethod
     def source_name(self) -> str:
         """Имя источника данных."""
 
-    @abstractmethod
+    @property
+    def cache_ttl(self) -> float:
+        """Время жизни кеша ответа (сек, 0 — без кеша)."""
+        return 0.0
+
     def fetch_rates(self) -> dict:
         """Получить курсы валют.
 
+        В пределах cache_ttl возвращает копию последнего
+        успешного ответа без HTTP-запроса. Во время
+        паузы после сбоя запрос не выполняется.
+        Каждая пара несёт updated_at — время реального
+        запроса к API, поэтому ответ из кеша не выдаётся
+        за свежий.
+
+        Returns:
+            Словарь {pair_key: {rate, source, meta,
+            updated_at}}.
+
+        Raises:
+            ApiRequestError: При ошибке запроса.
+        """
+        cached = self._cached
+        if (
+            cached is not None
+            and time.monotonic() - cached[0] < self.cache_ttl
+        ):
+            return copy.deepcopy(cached[1])
+
+        now = time.monotonic()
+        if now < self._retry_at:
+            raise ApiRequestError(
+                f"{self.source_name}: повтор через "
+                f"{self._retry_at - now:.0f} с"
+            )
+        try:
+            result = self._request_rates()
+        except ApiRequestError:
+            self._failures += 1
+            delay = random.uniform(
+                0, min(_BACKOFF_CAP, 2.0**self._failures)
+            )
+            self._retry_at = time.monotonic() + delay
+            raise
+        self._failures = 0
+        fetched_at = datetime.now(timezone.utc).isoformat()
+        for info in result.values():
+            info.setdefault("updated_at", fetched_at)
+        self._cached = (time.monotonic(), result)
+        return copy.deepcopy(result)
+
+    @abstractmethod
+    def _request_rates(self) -> dict:
+        """Запросить курсы у API (без кеша).
+
         Returns:
             Словарь {pair_key: {rate, source, meta}}.
 
@@ -52,29 +165,52 @@ class CoinGeckoClient(BaseApiClient):
     тикеров (BTC) на CoinGecko ID (bitcoin).
     """
 
+    def __init__(self, config: ParserConfig | None = None):
+        """Инициализировать клиент.
+
+        URL запроса и маппинг ID -> ключ пары
+        (bitcoin -> BTC_USD) строятся один раз
+        из неизменяемого конфига.
+
+        Args:
+            config: Конфигурация Parser Service
+                (по умолчанию общий CONFIG).
+        """
+        super().__init__(config)
+        config = self.config
+        self._base = config.BASE_CURRENCY.lower()
+        self._pair_keys = {
+            crypto_id: f"{code}_{config.BASE_CURRENCY}"
+            for code, crypto_id in config.CRYPTO_ID_MAP.items()
+        }
+        ids = ",".join(config.CRYPTO_ID_MAP.values())
+        self._url = (
+            f"{config.COINGECKO_URL}"
+            f"?ids={ids}&vs_currencies={self._base}"
+        )
+
     @property
     def source_name(self) -> str:
         """Имя источника."""
         return "CoinGecko"
 
-    def fetch_rates(self) -> dict:
+    @property
+    def cache_ttl(self) -> float:
+        """CoinGecko обновляет цены примерно раз в минуту."""
+        return self.config.CACHE_TTL_COINGECKO
+
+    def _request_rates(self) -> dict:
         """Получить курсы криптовалют.
 
         Returns:
             {'BTC_USD': {'rate': 59337.21, ...}, ...}
         """
-        ids = ",".join(
-            self.config.CRYPTO_ID_MAP.values()
-        )
-        base = self.config.BASE_CURRENCY.lower()
-        url = (
-            f"{self.config.COINGECKO_URL}"
-            f"?ids={ids}&vs_currencies={base}"
-        )
+        base = self._base
+        url = self._url
 
-        start = time.time()
+        start = time.perf_counter()
         try:
-            resp = requests.get(
+            resp = self._session.get(
                 url,
                 timeout=self.config.REQUEST_TIMEOUT,
             )
@@ -85,34 +221,25 @@ class CoinGeckoClient(BaseApiClient):
                 f"CoinGecko: {e}"
             ) from e
 
-        elapsed = int((time.time() - start) * 1000)
+        elapsed = int((time.perf_counter() - start) * 1000)
         status = resp.status_code
 
-        id_to_code = {
-            v: k
-            for k, v in self.config.CRYPTO_ID_MAP.items()
+        pair_keys = self._pair_keys
+        source = self.source_name
+        return {
+            pair_keys[crypto_id]: {
+                "rate": prices[base],
+                "source": source,
+                "meta": {
+                    "raw_id": crypto_id,
+                    "request_ms": elapsed,
+                    "status_code": status,
+                },
+            }
+            for crypto_id, prices in data.items()
+            if crypto_id in pair_keys and base in prices
         }
 
-        result = {}
-        for crypto_id, prices in data.items():
-            code = id_to_code.get(crypto_id)
-            if code and base in prices:
-                key = (
-                    f"{code}"
-                    f"_{self.config.BASE_CURRENCY}"
-                )
-                result[key] = {
-                    "rate": prices[base],
-                    "source": self.source_name,
-                    "meta": {
-                        "raw_id": crypto_id,
-                        "request_ms": elapsed,
-                        "status_code": status,
-                    },
-                }
-
-        return result
-
 
 class ExchangeRateApiClient(BaseApiClient):
     """Клиент ExchangeRate-API для фиатных валют.
@@ -126,7 +253,12 @@ class ExchangeRateApiClient(BaseApiClient):
         """Имя источника."""
         return "ExchangeRate-API"
 
-    def fetch_rates(self) -> dict:
+    @property
+    def cache_ttl(self) -> float:
+        """ExchangeRate-API обновляет курсы раз в час."""
+        return self.config.CACHE_TTL_EXCHANGERATE
+
+    def _request_rates(self) -> dict:
         """Получить курсы фиатных валют.
 
         Конвертирует ответ API (1 USD = X FIAT)
@@ -148,9 +280,9 @@ class ExchangeRateApiClient(BaseApiClient):
             f"/{key}/latest/{base}"
         )
 
-        start = time.time()
+        start = time.perf_counter()
         try:
-            resp = requests.get(
+            resp = self._session.get(
                 url,
                 timeout=self.config.REQUEST_TIMEOUT,
             )
@@ -161,7 +293,7 @@ class ExchangeRateApiClient(BaseApiClient):
                 f"ExchangeRate-API: {e}"
             ) from e
 
-        elapsed = int((time.time() - start) * 1000)
+        elapsed = int((time.perf_counter() - start) * 1000)
         status = resp.status_code
 
         if data.get("result") != "success":
@@ -177,19 +309,17 @@ class ExchangeRateApiClient(BaseApiClient):
             data.get("rates", {}),
         )
 
-        result = {}
-        for fiat_code in self.config.FIAT_CURRENCIES:
-            raw = api_rates.get(fiat_code)
-            if raw and raw > 0:
-                pair = f"{fiat_code}_{base}"
-                result[pair] = {
-                    "rate": 1.0 / raw,
-                    "source": self.source_name,
-                    "meta": {
-                        "raw_rate": raw,
-                        "request_ms": elapsed,
-                        "status_code": status,
-                    },
-                }
-
-        return result
+        source = self.source_name
+        return {
+            f"{fiat_code}_{base}": {
+                "rate": 1.0 / raw,
+                "source": source,
+                "meta": {
+                    "raw_rate": raw,
+                    "request_ms": elapsed,
+                    "status_code": status,
+                },
+            }
+            for fiat_code in self.config.FIAT_CURRENCIES
+            if (raw := api_rates.get(fiat_code)) and raw > 0
+        }
@@ -6,8 +6,10 @@ API-ключи, эндпоинты, списки валют, параметры
 """
 
 import os
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from pathlib import Path
+from types import MappingProxyType
 
 from dotenv import load_dotenv
 
@@ -17,11 +19,27 @@ _ENV_PATH = (
 )
 load_dotenv(_ENV_PATH)
 
+# Тикер -> CoinGecko ID; общий для всех экземпляров
+_CRYPTO_ID_MAP = MappingProxyType(
+    {
+        "BTC": "bitcoin",
+        "ETH": "ethereum",
+        "SOL": "solana",
+        "DOGE": "dogecoin",
+        "XRP": "ripple",
+    }
+)
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ParserConfig:
     """Настройки для Parser Service.
 
+    Неизменяемы: экземпляр без __dict__, маппинг
+    CRYPTO_ID_MAP — общий read-only вид, а не новый
+    словарь на каждый экземпляр. Обычно достаточно
+    общего экземпляра CONFIG.
+
     Attributes:
         EXCHANGERATE_API_KEY: Ключ API (из env).
         COINGECKO_URL: Эндпоинт CoinGecko.
@@ -31,6 +49,12 @@ class ParserConfig:
         CRYPTO_CURRENCIES: Криптовалюты.
         CRYPTO_ID_MAP: Тикер -> CoinGecko ID.
         REQUEST_TIMEOUT: Таймаут запроса (сек).
+        HTTP_RETRIES: Повторы запроса при 429/5xx;
+            по умолчанию один — update-rates в CLI
+            не должен висеть десятки секунд.
+        CACHE_TTL_COINGECKO: Кеш ответа CoinGecko (сек).
+        CACHE_TTL_EXCHANGERATE: Кеш ответа
+            ExchangeRate-API (сек).
     """
 
     EXCHANGERATE_API_KEY: str = field(
@@ -63,14 +87,16 @@ class ParserConfig:
         "DOGE",
         "XRP",
     )
-    CRYPTO_ID_MAP: dict = field(
-        default_factory=lambda: {
-            "BTC": "bitcoin",
-            "ETH": "ethereum",
-            "SOL": "solana",
-            "DOGE": "dogecoin",
-            "XRP": "ripple",
-        }
+    CRYPTO_ID_MAP: Mapping[str, str] = field(
+        default_factory=lambda: _CRYPTO_ID_MAP
     )
 
     REQUEST_TIMEOUT: int = 10
+    HTTP_RETRIES: int = 1
+
+    CACHE_TTL_COINGECKO: int = 60
+    CACHE_TTL_EXCHANGERATE: int = 3600
+
+
+# Общая конфигурация (переменные окружения читаются при импорте)
+CONFIG = ParserConfig()
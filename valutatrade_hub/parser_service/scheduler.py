@@ -1,10 +1,14 @@
 """Планировщик периодического обновления курсов.
 
-Запускает RatesUpdater по таймеру в фоновом потоке.
+Запускает RatesUpdater по таймеру в фоновом потоке:
+один поток-цикл, ожидание на threading.Event,
+расписание по time.monotonic() без дрейфа.
 """
 
 import logging
+import random
 import threading
+import time
 
 from valutatrade_hub.parser_service.updater import (
     RatesUpdater,
@@ -30,59 +34,104 @@ class Scheduler:
         self,
         updater: RatesUpdater,
         interval_seconds: int = 300,
+        jitter_seconds: float = 0.0,
     ):
         """Инициализировать планировщик.
 
         Args:
             updater: Экземпляр RatesUpdater.
             interval_seconds: Интервал (секунды).
+            jitter_seconds: Случайная задержка запуска
+                0..jitter (сек) — экземпляры сервиса
+                не обращаются к API одновременно.
         """
         self._updater = updater
         self._interval = interval_seconds
-        self._timer: threading.Timer | None = None
-        self._running = False
+        self._jitter = jitter_seconds
+        self._stop_evt = threading.Event()
+        self._thread: threading.Thread | None = None
 
     def start(self) -> None:
         """Запустить периодическое обновление."""
-        if self._running:
+        if self.is_running:
             _logger.warning(
                 "Scheduler already running"
             )
             return
-        self._running = True
+        self._stop_evt.clear()
+        self._thread = threading.Thread(
+            target=self._loop,
+            name="rates-scheduler",
+            daemon=True,
+        )
+        self._thread.start()
         _logger.info(
             "Scheduler started (interval=%ds)",
             self._interval,
         )
-        self._schedule_next()
-
-    def stop(self) -> None:
-        """Остановить планировщик."""
-        self._running = False
-        if self._timer:
-            self._timer.cancel()
-            self._timer = None
+
+    def stop(self, timeout: float | None = 30.0) -> None:
+        """Остановить планировщик и дождаться потока.
+
+        Args:
+            timeout: Сколько ждать текущее обновление
+                (сек); None — без ограничения. Поток
+                daemon, поэтому зависший запрос
+                не удерживает выход из программы.
+        """
+        self._stop_evt.set()
+        thread = self._thread
+        self._thread = None
+        if (
+            thread is not None
+            and thread is not threading.current_thread()
+        ):
+            thread.join(timeout)
+            if thread.is_alive():
+                _logger.warning(
+                    "Scheduler thread did not stop "
+                    "within %.1fs",
+                    timeout,
+                )
+                return
         _logger.info("Scheduler stopped")
 
     @property
     def is_running(self) -> bool:
         """Проверить, запущен ли планировщик."""
-        return self._running
-
-    def _schedule_next(self) -> None:
-        """Запланировать следующее обновление."""
-        if not self._running:
-            return
-        self._timer = threading.Timer(
-            self._interval, self._tick
+        return (
+            self._thread is not None
+            and not self._stop_evt.is_set()
         )
-        self._timer.daemon = True
-        self._timer.start()
+
+    def _loop(self) -> None:
+        """Цикл фонового потока: ждать срока и обновлять.
+
+        Сроки отсчитываются от монотонных часов с шагом
+        interval — длительность обновления не сдвигает
+        расписание. Если обновление заняло больше
+        интервала, пропущенные сроки не догоняются.
+        Джиттер сдвигает только отдельный запуск,
+        а не само расписание.
+        """
+        next_tick = time.monotonic() + self._interval
+        while not self._stop_evt.wait(
+            max(0.0, self._deadline(next_tick) - time.monotonic())
+        ):
+            self._tick()
+            next_tick += self._interval
+            now = time.monotonic()
+            if next_tick < now:
+                next_tick = now + self._interval
+
+    def _deadline(self, next_tick: float) -> float:
+        """Срок запуска с учётом случайного джиттера."""
+        if self._jitter <= 0:
+            return next_tick
+        return next_tick + random.uniform(0, self._jitter)
 
     def _tick(self) -> None:
         """Выполнить одно обновление."""
-        if not self._running:
-            return
         try:
             result = self._updater.run_update()
             _logger.info(
@@ -93,4 +142,3 @@ class Scheduler:
             _logger.error(
                 "Scheduled update failed: %s", exc
             )
-        self._schedule_next()
@@ -1,20 +1,86 @@
-"""Операции чтения/записи exchange_rates.json и rates.json.
+"""Операции чтения/записи exchange_rates.jsonl и rates.json.
 
-Атомарная запись: временный файл -> rename.
+Журнал — JSON Lines, только дозапись в конец.
+Кеш — атомарная компактная запись: временный файл -> rename.
 """
 
+import contextlib
 import json
 import os
 import tempfile
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from itertools import islice
 
 from valutatrade_hub.infra.settings import SettingsLoader
 
+# Компактная сериализация: без отступов и пробелов
+_COMPACT = {"ensure_ascii": False, "separators": (",", ":")}
+# Метка для пустого/некорректного updated_at
+_OLDEST = datetime.min.replace(tzinfo=timezone.utc)
+
+
+@dataclass(slots=True)
+class HistoryRecord:
+    """Запись журнала exchange_rates.jsonl.
+
+    Слоты вместо словаря на каждую запись: меньше
+    памяти и быстрее создание при разборе ответов.
+
+    Attributes:
+        id: <FROM>_<TO>_<ISO-UTC timestamp>.
+        from_currency: Код исходной валюты.
+        to_currency: Код целевой валюты.
+        rate: Курс.
+        timestamp: Время измерения (ISO-UTC).
+        source: Имя источника.
+        meta: Служебные данные запроса.
+    """
+
+    id: str
+    from_currency: str
+    to_currency: str
+    rate: float
+    timestamp: str
+    source: str
+    meta: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        """Сериализовать запись в словарь (без копий)."""
+        return {
+            "id": self.id,
+            "from_currency": self.from_currency,
+            "to_currency": self.to_currency,
+            "rate": self.rate,
+            "timestamp": self.timestamp,
+            "source": self.source,
+            "meta": self.meta,
+        }
+
+
+def _parse_ts(value) -> datetime:
+    """Разобрать ISO-метку в aware datetime.
+
+    Наивные метки считаются UTC; пустые
+    и некорректные — самыми старыми.
+    """
+    try:
+        ts = datetime.fromisoformat(
+            str(value).replace("Z", "+00:00")
+        )
+    except ValueError:
+        return _OLDEST
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
 
 class RatesStorage:
     """Хранилище курсов: история и кеш.
 
-    exchange_rates.json — «журнал» всех измерений.
+    exchange_rates.jsonl — «журнал» всех измерений
+    (одна запись JSON на строку).
     rates.json — «снимок текущего мира» (кеш).
     """
 
@@ -26,47 +92,125 @@ class RatesStorage:
             data_dir, "rates.json"
         )
         self._history_path = os.path.join(
+            data_dir, "exchange_rates.jsonl"
+        )
+        self._legacy_history_path = os.path.join(
             data_dir, "exchange_rates.json"
         )
+        self._history_ids: set | None = None
         os.makedirs(data_dir, exist_ok=True)
 
-    # ── History (exchange_rates.json) ─────────────────
+    # ── History (exchange_rates.jsonl) ────────────────
 
     def append_history(
-        self, records: list[dict]
+        self, records: list[HistoryRecord | dict]
     ) -> int:
         """Добавить записи в журнал.
 
         id = <FROM>_<TO>_<ISO-UTC timestamp>.
-        Пропускает дубликаты по id.
+        Пропускает записи, чьи id уже есть в журнале.
+        Внутри одной пачки id уникальны (общая метка
+        времени), поэтому пачка сверяется только
+        с сохранёнными id. Новые записи дописываются
+        в конец файла — существующий журнал
+        не перечитывается и не перезаписывается.
 
         Args:
-            records: Список новых записей.
+            records: Новые записи (HistoryRecord или
+                словари старого журнала).
 
         Returns:
             Количество добавленных записей.
         """
-        existing = self._read(
-            self._history_path, default=[]
-        )
-        if not isinstance(existing, list):
-            existing = []
+        ids = self._load_history_ids()
+        new = [
+            rec.to_dict() if isinstance(rec, HistoryRecord) else rec
+            for rec in records
+        ]
+        new = [rec for rec in new if rec.get("id") not in ids]
+        if not new:
+            return 0
 
-        existing_ids = {
-            r.get("id") for r in existing
-        }
-        added = 0
-        for rec in records:
-            rid = rec.get("id")
-            if rid not in existing_ids:
-                existing.append(rec)
-                existing_ids.add(rid)
-                added += 1
-
-        self._atomic_write(
-            self._history_path, existing
+        ids.update(rec.get("id") for rec in new)
+        with open(
+            self._history_path, "a", encoding="utf-8"
+        ) as fh:
+            fh.write(
+                "".join(
+                    json.dumps(rec, **_COMPACT) + "\n"
+                    for rec in new
+                )
+            )
+        return len(new)
+
+    def iter_history(
+        self,
+        limit: int | None = None,
+        reverse: bool = False,
+    ):
+        """Потоково перебрать записи журнала.
+
+        Файл читается построчно; в памяти держится
+        не больше limit записей; множество id
+        не строится. Старый exchange_rates.json, если
+        он ещё есть, предварительно переносится
+        в журнал (см. _load_history_ids).
+
+        Args:
+            limit: Максимум записей (None — все).
+            reverse: Сначала новые (последние limit).
+
+        Returns:
+            Итератор по записям.
+        """
+        if self._history_ids is None and os.path.exists(
+            self._legacy_history_path
+        ):
+            self._load_history_ids()
+        records = self._iter_history()
+        if reverse:
+            return reversed(deque(records, maxlen=limit))
+        return islice(records, limit)
+
+    def _load_history_ids(self) -> set:
+        """Множество id журнала (читается один раз).
+
+        При первом обращении переносит записи из старого
+        exchange_rates.json в exchange_rates.jsonl.
+        """
+        if self._history_ids is None:
+            self._history_ids = {
+                rec.get("id") for rec in self._iter_history()
+            }
+            self._migrate_legacy_history()
+        return self._history_ids
+
+    def _iter_history(self):
+        """Построчно прочитать записи журнала."""
+        try:
+            fh = open(self._history_path, encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Оборванная строка после сбоя
+                    continue
+
+    def _migrate_legacy_history(self) -> None:
+        """Перенести журнал из формата JSON-списка."""
+        legacy = self._read(
+            self._legacy_history_path, default=None
         )
-        return added
+        if legacy is None:
+            return
+        if isinstance(legacy, list):
+            self.append_history(legacy)
+        os.remove(self._legacy_history_path)
 
     # ── Cache (rates.json) ────────────────────────────
 
@@ -76,7 +220,11 @@ class RatesStorage:
         """Обновить кеш курсов.
 
         Для каждой пары — перезаписать,
-        если updated_at свежее текущего.
+        если updated_at свежее текущего. Метки
+        сравниваются как datetime; наивные считаются
+        UTC. Пары без updated_at получают время этого
+        обновления. last_refresh сдвигается и файл
+        пишется, только если применена хотя бы одна пара.
 
         Args:
             pairs: {'BTC_USD': {'rate': ..., 'source': ...}}
@@ -92,66 +240,80 @@ class RatesStorage:
 
         existing = cache.get("pairs", {})
         now = datetime.now(timezone.utc).isoformat()
-        updated = 0
-
+        fresh = {}
         for key, info in pairs.items():
-            existing[key] = {
+            updated_at = info.get("updated_at", now)
+            current = existing.get(key)
+            if current and (
+                _parse_ts(updated_at)
+                < _parse_ts(current.get("updated_at"))
+            ):
+                continue
+            fresh[key] = {
                 "rate": info["rate"],
-                "updated_at": now,
-                "source": info.get(
-                    "source", "unknown"
-                ),
+                "updated_at": updated_at,
+                "source": info.get("source", "unknown"),
             }
-            updated += 1
+        if not fresh:
+            return 0
 
+        existing.update(fresh)
         cache["pairs"] = existing
         cache["last_refresh"] = now
         self._atomic_write(self._rates_path, cache)
-        return updated
+        return len(fresh)
+
+    def last_refresh(self) -> str | None:
+        """Сохранённый в rates.json last_refresh."""
+        cache = self._read(self._rates_path, default={})
+        if not isinstance(cache, dict):
+            return None
+        return cache.get("last_refresh")
 
     # ── I/O ───────────────────────────────────────────
 
     def _read(self, path: str, default=None):
-        """Прочитать JSON-файл."""
-        if not os.path.exists(path):
+        """Прочитать JSON-файл (отсутствие файла — default)."""
+        try:
+            with open(path, "rb") as fh:
+                raw = fh.read()
+        except FileNotFoundError:
+            return default
+        try:
+            return json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
             return default
-        with open(path, encoding="utf-8") as fh:
-            try:
-                return json.load(fh)
-            except json.JSONDecodeError:
-                return default
 
     def _atomic_write(
         self, path: str, data
     ) -> None:
         """Атомарная запись: tmp -> rename.
 
+        Один os.replace без предварительной проверки
+        существования цели. JSON пишется компактно,
+        без отступов — файл читает только программа.
         На Windows os.replace может не быть полностью
         атомарным, но это лучшее доступное решение.
+
+        Raises:
+            OSError: Если запись не удалась (временный
+                файл удаляется, целевой не меняется).
         """
-        dir_name = os.path.dirname(path)
+        text = json.dumps(data, **_COMPACT)
+        tmp_path = None
         try:
             fd, tmp_path = tempfile.mkstemp(
                 suffix=".tmp",
-                dir=dir_name,
+                dir=os.path.dirname(path),
             )
             with os.fdopen(
                 fd, "w", encoding="utf-8"
             ) as tmp:
-                json.dump(
-                    data,
-                    tmp,
-                    ensure_ascii=False,
-                    indent=2,
-                )
+                tmp.write(text)
             os.replace(tmp_path, path)
         except OSError:
-            with open(
-                path, "w", encoding="utf-8"
-            ) as fh:
-                json.dump(
-                    data,
-                    fh,
-                    ensure_ascii=False,
-                    indent=2,
-                )
+            # Прежний файл остаётся целым — без прямой записи
+            if tmp_path:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+            raise
@@ -1,11 +1,13 @@
 """Координатор обновления курсов (RatesUpdater).
 
 Получает данные от API-клиентов, объединяет,
-сохраняет в историю (exchange_rates.json) и кеш
+сохраняет в историю (exchange_rates.jsonl) и кеш
 (rates.json).
 """
 
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 from valutatrade_hub.core.exceptions import (
@@ -15,12 +17,22 @@ from valutatrade_hub.parser_service.api_clients import (
     BaseApiClient,
 )
 from valutatrade_hub.parser_service.storage import (
+    HistoryRecord,
     RatesStorage,
 )
 
 _logger = logging.getLogger("valutatrade_hub.parser")
 
 
+def _fetch(client: BaseApiClient) -> dict | ApiRequestError:
+    """Получить курсы от клиента, вернув ошибку как значение."""
+    _logger.info("Fetching from %s...", client.source_name)
+    try:
+        return client.fetch_rates()
+    except ApiRequestError as exc:
+        return exc
+
+
 class RatesUpdater:
     """Точка входа для логики парсинга курсов.
 
@@ -33,23 +45,40 @@ class RatesUpdater:
         self,
         clients: list[BaseApiClient],
         storage: RatesStorage,
+        cache_write_interval: float = 30.0,
     ):
         """Инициализировать обновлятель.
 
         Args:
             clients: Список API-клиентов.
             storage: Хранилище курсов.
+            cache_write_interval: Минимальный интервал
+                (сек) между записями rates.json, если
+                курсы не изменились.
         """
         self._clients = clients
         self._storage = storage
+        self._cache_write_interval = cache_write_interval
+        self._last_cache_write: float | None = None
+        # Последний записанный в журнал курс по каждой паре
+        self._last_rates: dict[str, float] = {}
 
     def run_update(self) -> dict:
         """Выполнить полный цикл обновления.
 
-        1. Опрашивает каждого клиента.
+        1. Опрашивает клиентов параллельно.
         2. Объединяет курсы.
         3. Сохраняет в историю и кеш.
 
+        В историю попадают только пары, чей курс
+        изменился с прошлого обновления этим же
+        экземпляром: при стабильном рынке журнал
+        не растёт. Кеш при неизменных курсах
+        перезаписывается не чаще cache_write_interval:
+        частые тики не дёргают диск. В пропущенном
+        тике last_refresh в rates.json не меняется,
+        и в итогах возвращается сохранённое значение.
+
         Returns:
             Итоги обновления::
 
@@ -57,11 +86,12 @@ class RatesUpdater:
                     'total_rates': int,
                     'errors': list[str],
                     'sources': dict[str, int],
-                    'last_refresh': str,
+                    'last_refresh': str | None,
                 }
         """
         all_pairs: dict = {}
-        history_records: list[dict] = []
+        history_records: list[HistoryRecord] = []
+        changed_rates: dict[str, float] = {}
         errors: list[str] = []
         sources: dict[str, int] = {}
 
@@ -69,39 +99,45 @@ class RatesUpdater:
             timezone.utc
         ).isoformat()
 
-        for client in self._clients:
+        for client, outcome in zip(
+            self._clients, self._fetch_all()
+        ):
             name = client.source_name
-            _logger.info(
-                "Fetching from %s...", name
-            )
-
-            try:
-                pairs = client.fetch_rates()
-                count = len(pairs)
-                sources[name] = count
-                _logger.info(
-                    "Fetching from %s... OK (%d rates)",
-                    name,
-                    count,
-                )
-
-                for key, info in pairs.items():
-                    all_pairs[key] = info
-                    record = self._make_record(
-                        key, info, now, name
-                    )
-                    history_records.append(record)
-
-            except ApiRequestError as exc:
-                msg = str(exc)
+            if isinstance(outcome, ApiRequestError):
+                msg = str(outcome)
                 errors.append(msg)
                 _logger.error(
                     "Failed to fetch from %s: %s",
                     name,
                     msg,
                 )
+                continue
 
-        if all_pairs:
+            count = len(outcome)
+            sources[name] = count
+            _logger.info(
+                "Fetching from %s... OK (%d rates)",
+                name,
+                count,
+            )
+            last_rates = self._last_rates
+            for key, info in outcome.items():
+                all_pairs[key] = info
+                rate = info["rate"]
+                if last_rates.get(key) != rate:
+                    changed_rates[key] = rate
+                    history_records.append(
+                        self._make_record(
+                            key,
+                            info,
+                            info.get("updated_at", now),
+                            name,
+                        )
+                    )
+
+        if all_pairs and self._cache_due(
+            changed=bool(history_records)
+        ):
             cache_n = self._storage.update_cache(
                 all_pairs
             )
@@ -114,9 +150,11 @@ class RatesUpdater:
             hist_n = self._storage.append_history(
                 history_records
             )
+            # Только после успешной записи в журнал
+            self._last_rates.update(changed_rates)
             _logger.info(
                 "Appended %d records to "
-                "exchange_rates.json",
+                "exchange_rates.jsonl",
                 hist_n,
             )
 
@@ -124,16 +162,50 @@ class RatesUpdater:
             "total_rates": len(all_pairs),
             "errors": errors,
             "sources": sources,
-            "last_refresh": now,
+            "last_refresh": self._storage.last_refresh(),
         }
 
+    def _cache_due(self, changed: bool) -> bool:
+        """Пора ли записать rates.json (и отметить запись)."""
+        now = time.monotonic()
+        last = self._last_cache_write
+        if (
+            not changed
+            and last is not None
+            and now - last < self._cache_write_interval
+        ):
+            return False
+        self._last_cache_write = now
+        return True
+
+    def _fetch_all(self) -> list:
+        """Опросить всех клиентов параллельно.
+
+        Запросы к API упираются в сеть, поэтому каждый
+        клиент опрашивается в своём потоке, и общее
+        время равно самому медленному источнику,
+        а не сумме. Порядок результатов совпадает
+        с порядком клиентов.
+
+        Returns:
+            Для каждого клиента — словарь курсов
+            или ApiRequestError.
+        """
+        if len(self._clients) < 2:
+            return [_fetch(c) for c in self._clients]
+        with ThreadPoolExecutor(
+            max_workers=len(self._clients),
+            thread_name_prefix="rates-fetch",
+        ) as pool:
+            return list(pool.map(_fetch, self._clients))
+
     @staticmethod
     def _make_record(
         key: str,
         info: dict,
         timestamp: str,
         source: str,
-    ) -> dict:
+    ) -> HistoryRecord:
         """Создать запись для журнала.
 
         id = <FROM>_<TO>_<ISO-UTC timestamp>.
@@ -144,12 +216,12 @@ class RatesUpdater:
             parts[1] if len(parts) > 1 else "USD"
         )
 
-        return {
-            "id": f"{key}_{timestamp}",
-            "from_currency": from_cur,
-            "to_currency": to_cur,
-            "rate": info["rate"],
-            "timestamp": timestamp,
-            "source": source,
-            "meta": info.get("meta", {}),
-        }
+        return HistoryRecord(
+            id=f"{key}_{timestamp}",
+            from_currency=from_cur,
+            to_currency=to_cur,
+            rate=info["rate"],
+            timestamp=timestamp,
+            source=source,
+            meta=info.get("meta", {}),
+        )